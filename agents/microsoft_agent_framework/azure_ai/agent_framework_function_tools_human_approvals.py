@@ -39,16 +39,20 @@ async def handle_approvals(query: str, agent) -> AgentRunResponseUpdate:
     conversation_history = [ChatMessage(role=Role.USER, contents=[TextContent(text=query)])]
     max_iterations = 5
     processed_approvals = set()  # Track which approvals we've already processed
+    last_signature = None  # Signature of the previous iteration's approval requests
 
     for iteration in range(max_iterations):
         # Run the agent and wait for the response
-        print_request(conversation_history, title=f"Agent Request Messages - Iteration {iteration + 1}")
+        # Rich rendering is CPU-bound, so keep it off the event loop
+        await asyncio.to_thread(
+            print_request, conversation_history, title=f"Agent Request Messages - Iteration {iteration + 1}"
+        )
         
         # Run the agent and wait for the response
         result = await await_for_response(agent.run(conversation_history))
 
         # Print the agent response
-        print_response(result)
+        await asyncio.to_thread(print_response, result)
         
         if result is None:
             rich.print("⚠ Warning: Received None result from agent")
@@ -58,6 +62,20 @@ async def handle_approvals(query: str, agent) -> AgentRunResponseUpdate:
             rich.print("✓ No more approvals needed. Task completed.")
             return result
 
+        # Stop early if the model keeps requesting the exact same tool calls
+        signature = hash(
+            tuple(
+                sorted(
+                    (request.function_call.name, str(request.function_call.arguments))
+                    for request in result.user_input_requests
+                )
+            )
+        )
+        if signature == last_signature:
+            rich.print("⚠ No progress since last iteration (identical tool calls), aborting")
+            break
+        last_signature = signature
+
         # Add the assistant message with the approval request
         new_approvals = False
         for user_input_needed in result.user_input_requests:
@@ -119,7 +137,7 @@ async def main() -> None:
 
         # Handle approvals
         final_result = await handle_approvals("Get detailed weather for Seattle", agent)
-        print_response(final_result)
+        await asyncio.to_thread(print_response, final_result)
 
         # Cleanup: close the agent client if it has a close method
         if hasattr(client, 'close'):
@@ -22,7 +22,7 @@ def main():
 
     print_request(messages, title=panel_title)
 
-    agent_response = wait_for_response(agent.client.chat.completions.create(
+    agent_response = wait_for_response(lambda: agent.client.chat.completions.create(
         model=agent.model,
         temperature=0.7,
         messages=messages,
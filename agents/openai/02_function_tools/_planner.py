@@ -0,0 +1,106 @@
+"""
+Tool call planner: group tool calls into dependency waves (LLMCompiler-style).
+
+A tool call depends on another when one of its string arguments references the other
+call's output with the placeholder ${call_id.field}. Calls in the same wave are
+independent and can be dispatched concurrently; waves run in order.
+"""
+
+import re
+
+import orjson
+
+PLACEHOLDER_PATTERN = re.compile(r"\$\{(?P<call_id>[^.}]+)\.(?P<field>[^}]+)\}")
+
+
+def _strings(value):
+    """Yield every string nested in a JSON value."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def find_dependencies(arguments) -> set[str]:
+    """Return the call ids referenced by placeholders in the arguments."""
+    return {
+        match.group("call_id")
+        for text in _strings(arguments)
+        for match in PLACEHOLDER_PATTERN.finditer(text)
+    }
+
+
+def resolve_arguments(arguments, results: dict):
+    """
+    Replace placeholders with the outputs of the calls they reference.
+
+    Args:
+        arguments: Parsed tool call arguments
+        results: Outputs of the already executed calls, keyed by call id
+
+    Returns:
+        The arguments with every resolvable placeholder substituted. A string that is a
+        single placeholder takes the referenced value as-is, otherwise it is interpolated.
+    """
+    if isinstance(arguments, dict):
+        return {key: resolve_arguments(value, results) for key, value in arguments.items()}
+    if isinstance(arguments, list):
+        return [resolve_arguments(value, results) for value in arguments]
+    if not isinstance(arguments, str):
+        return arguments
+
+    def lookup(match):
+        output = results.get(match.group("call_id"))
+        if not isinstance(output, dict) or match.group("field") not in output:
+            return None
+        return output[match.group("field")]
+
+    whole = PLACEHOLDER_PATTERN.fullmatch(arguments)
+    if whole:
+        value = lookup(whole)
+        return arguments if value is None else value
+
+    def interpolate(match):
+        value = lookup(match)
+        return match.group(0) if value is None else str(value)
+
+    return PLACEHOLDER_PATTERN.sub(interpolate, arguments)
+
+
+class Plan:
+    """Dependency planner for the tool calls of a single model response."""
+
+    @staticmethod
+    def from_tool_calls(calls) -> list[list]:
+        """
+        Group tool calls into waves in topological order.
+
+        Args:
+            calls: Tool calls returned by the model
+
+        Returns:
+            list[list[ToolCall]]: Waves of mutually independent calls. Calls whose
+            dependencies can never be satisfied (cycles) are placed in a final wave.
+        """
+        call_ids = {call.id for call in calls}
+        pending = {
+            call.id: find_dependencies(orjson.loads(call.function.arguments or "{}")) & call_ids
+            for call in calls
+        }
+
+        waves = []
+        done = set()
+        remaining = list(calls)
+        while remaining:
+            wave = [call for call in remaining if pending[call.id] <= done]
+            if not wave:
+                waves.append(remaining)
+                break
+            waves.append(wave)
+            done.update(call.id for call in wave)
+            remaining = [call for call in remaining if call.id not in done]
+        return waves
@@ -0,0 +1,123 @@
+"""
+Parallel tool runner: plan the tool calls with one completion, execute them concurrently
+and compose the final answer with a single follow-up completion (LLMCompiler-style).
+"""
+
+import asyncio
+
+import orjson
+import rich
+
+from agents.openai.openai_client import AsyncOpenAIClient
+from agents.openai.print_utils import print_request, print_response
+from utils.agent_utils import await_for_response
+
+from ._planner import Plan, resolve_arguments
+
+SUMMARY_PROMPT = (
+    "All the requested tool results are available above. Answer the user using them, without calling any more tools."
+)
+
+
+async def dispatch_tool_calls(tool_calls, functions: dict) -> list[dict]:
+    """
+    Execute the tool calls wave by wave, running the calls of each wave concurrently.
+
+    Args:
+        tool_calls: Tool calls returned by the model
+        functions: Map of function names to async callables
+
+    Returns:
+        list[dict]: One tool message per tool call, in the original order
+    """
+    results = {}
+    executions = {}  # Identical calls (same name and arguments) share one execution
+
+    async def invoke(function_name: str, args: dict):
+        if function_name not in functions:
+            rich.print(f"[red]Function '{function_name}' not found.[/red]")
+            return {"error": f"Function '{function_name}' not found."}
+        return await functions[function_name](**args)
+
+    async def execute(call):
+        function_name = call.function.name
+        args = resolve_arguments(orjson.loads(call.function.arguments or "{}"), results)
+
+        key = (function_name, orjson.dumps(args, option=orjson.OPT_SORT_KEYS))
+        if key in executions:
+            rich.print(f"Tool request (duplicate, reusing result): {function_name}({args})")
+        else:
+            rich.print(f"Tool request: {function_name}({args})")
+            executions[key] = asyncio.ensure_future(invoke(function_name, args))
+        return await executions[key]
+
+    for wave in Plan.from_tool_calls(tool_calls):
+        outputs = await asyncio.gather(*(execute(call) for call in wave))
+        results.update(zip((call.id for call in wave), outputs))
+
+    return [
+        {
+            "role": "tool",
+            "tool_call_id": call.id,
+            "content": orjson.dumps(results[call.id]).decode(),
+        }
+        for call in tool_calls
+    ]
+
+
+async def run_parallel_tools(
+    agent: AsyncOpenAIClient,
+    messages: list,
+    tools,
+    functions: dict,
+    title: str = "Agent Messages",
+):
+    """
+    Run a tool-using conversation in at most two model round-trips.
+
+    The first completion plans every tool call up front. All calls are dispatched
+    concurrently and the final completion is asked to answer from the combined
+    results with tools disabled, so it cannot start another tool loop.
+
+    Args:
+        agent: The async OpenAI client wrapper to use
+        messages: Conversation messages, extended in place with the tool turn
+        tools: Tool schemas offered to the model
+        functions: Map of function names to async callables
+        title: Title of the request panel
+
+    Returns:
+        ChatCompletion: The final model response
+    """
+    # Render the request panel in a thread while the first round-trip is in flight
+    agent_response, _ = await asyncio.gather(
+        await_for_response(agent.client.chat.completions.create(
+            model=agent.model,
+            temperature=0.7,
+            messages=messages,
+            tools=tools,
+            tool_choice="auto",
+            # parallel_tool_calls=False, <----- Disable sequential tool calls
+        )),
+        asyncio.to_thread(print_request, messages, title=title),
+    )
+
+    message = agent_response.choices[0].message
+    if not message.tool_calls:
+        return agent_response
+
+    print_response(agent_response)
+
+    # Append the assistant's message with the tool calls, then every tool result
+    messages.append(message)
+    messages.extend(await dispatch_tool_calls(message.tool_calls, functions))
+    messages.append({"role": "user", "content": SUMMARY_PROMPT})
+
+    rich.print("\n[bold green]Tool results added to the conversation.[/bold green]\n")
+
+    # Compose the final answer from all tool results in a single completion
+    return await await_for_response(agent.client.chat.completions.create(
+        model=agent.model,
+        temperature=0.7,
+        messages=messages,
+    ))
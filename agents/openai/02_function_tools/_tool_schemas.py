@@ -0,0 +1,34 @@
+"""
+Function tool schemas shared by the function tools examples.
+"""
+
+WEATHER_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "lookup_weather",
+        "description": "Get the current weather for a location.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "location": {"type": "string"},
+                "unit": {"type": "string", "enum": ["celsius", "fahrenheit"]},
+            },
+            "required": ["location"],
+        },
+    },
+}
+
+LOCATION_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "lookup_location",
+        "description": "Return latitude/longitude and country for a given city.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "city": {"type": "string", "description": "City name to look up."}
+            },
+            "required": ["city"],
+        },
+    },
+}
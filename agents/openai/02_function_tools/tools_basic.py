@@ -1,32 +1,18 @@
 """
 Basic example of using an agent with tools.
 """
-import json
 
+import orjson
 import rich
 
-from agents.openai.openai_client import OpenAIClient
+from agents.openai.openai_client import get_openai_client
 from agents.openai.print_utils import print_request, print_response
 from utils.agent_utils import wait_for_response
 
+from ._tool_schemas import WEATHER_TOOL
+
 # --- Define the tool (function) ---
-tools = [
-    {
-        "type": "function",
-        "function": {
-            "name": "lookup_weather",
-            "description": "Get the current weather for a location.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "location": {"type": "string"},
-                    "unit": {"type": "string", "enum": ["celsius", "fahrenheit"]},
-                },
-                "required": ["location"],
-            },
-        },
-    }
-]
+tools = (WEATHER_TOOL,)
 
 
 def lookup_weather(location: str, unit: str = "celsius"):
@@ -49,24 +35,21 @@ def lookup_weather(location: str, unit: str = "celsius"):
     }
 
 
-agent = OpenAIClient()
 messages = [
     {"role": "system", "content": "You are a weather assistant that uses emojis."},
     {"role": "user", "content": "What's the weather like in Sydney right now?"},
 ]
 
-panel_title = (
-    f"Tools Basic - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
-)
-
 
 def main():
     """ Run the agent with tools. """
+    agent = get_openai_client()
+    panel_title = f"Tools Basic - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
 
     print_request(messages, title=panel_title)
 
     # Chat Completion
-    agent_response = wait_for_response(agent.client.chat.completions.create(
+    agent_response = wait_for_response(lambda: agent.client.chat.completions.create(
         model=agent.model,
         temperature=0.7,
         messages=messages,
@@ -83,7 +66,7 @@ def main():
 
         # Execute the tool based on the tool call
         if tool_call.function.name == "lookup_weather":
-            args = json.loads(tool_call.function.arguments)
+            args = orjson.loads(tool_call.function.arguments)
             weather_info = lookup_weather(**args)
             rich.print(f"[bold green]Weather Info:[/bold green] {weather_info}")
     else:
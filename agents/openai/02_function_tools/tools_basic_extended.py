@@ -1,32 +1,18 @@
 """
 Tools Basic Extended: Assistant chat using a tool (function) to lookup weather information with emoji responses.
 """
-import json
 
+import orjson
 import rich
 
-from agents.openai.openai_client import OpenAIClient
+from agents.openai.openai_client import get_openai_client
 from agents.openai.print_utils import print_request, print_response
 from utils.agent_utils import wait_for_response
 
+from ._tool_schemas import WEATHER_TOOL
+
 # --- Define the tool (function) ---
-tools = [
-    {
-        "type": "function",
-        "function": {
-            "name": "lookup_weather",
-            "description": "Get the current weather for a location.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "location": {"type": "string"},
-                    "unit": {"type": "string", "enum": ["celsius", "fahrenheit"]},
-                },
-                "required": ["location"],
-            },
-        },
-    }
-]
+tools = (WEATHER_TOOL,)
 
 
 def lookup_weather(location: str, unit: str = "celsius"):
@@ -49,20 +35,20 @@ def lookup_weather(location: str, unit: str = "celsius"):
     }
 
 
-agent = OpenAIClient()
 messages = [
     {"role": "system", "content": "You are a weather assistant that uses emojis."},
     {"role": "user", "content": "What's the weather like in Sydney right now?"},
 ]
 
-panel_title = f"Tools Basic Extended - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
 
 def main():
     """ Run the agent with tools. """
+    agent = get_openai_client()
+    panel_title = f"Tools Basic Extended - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
 
     print_request(messages, title=panel_title)
 
-    agent_response = wait_for_response(agent.client.chat.completions.create(
+    agent_response = wait_for_response(lambda: agent.client.chat.completions.create(
         model=agent.model,
         temperature=0.7,
         messages=messages,
@@ -83,7 +69,7 @@ def main():
             # Append the assistant's message with the tool call to the messages
             messages.append(agent_response.choices[0].message)
 
-            args = json.loads(tool_call.function.arguments)
+            args = orjson.loads(tool_call.function.arguments)
             weather_info = lookup_weather(**args)
 
             # Append the tool's response to the messages
@@ -96,7 +82,7 @@ def main():
             )
 
             # Get a final response from the agent after tool execution
-            final_response = wait_for_response(agent.client.chat.completions.create(
+            final_response = wait_for_response(lambda: agent.client.chat.completions.create(
                 model=agent.model,
                 temperature=0.7,
                 messages=messages,
@@ -1,49 +1,55 @@
 """ """
 
-import json
-from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+import sys
+from contextvars import ContextVar
+from types import MappingProxyType
 
-import rich
+from agents.openai.openai_client import AsyncOpenAIClient
+from agents.openai.print_utils import print_response
 
-from agents.openai.openai_client import OpenAIClient
-from agents.openai.print_utils import print_request, print_response
-from utils.agent_utils import wait_for_response
+from ._runner import run_parallel_tools
+from ._tool_schemas import LOCATION_TOOL, WEATHER_TOOL
 
 # --- Define the tool (function) ---
-tools = [
-    {
-        "type": "function",
-        "function": {
-            "name": "lookup_weather",
-            "description": "Get the current weather for a location.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "location": {"type": "string"},
-                    "unit": {"type": "string", "enum": ["celsius", "fahrenheit"]},
-                },
-                "required": ["location"],
-            },
-        },
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "lookup_location",
-            "description": "Return latitude/longitude and country for a given city.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "city": {"type": "string", "description": "City name to look up."}
-                },
-                "required": ["city"],
-            },
-        },
-    },
-]
+tools = (WEATHER_TOOL, LOCATION_TOOL)
+
+
+# Request-scoped tool cache; set in run() so separate agent invocations never share results
+_tool_cache: ContextVar[dict | None] = ContextVar("tool_cache", default=None)
+
+
+def request_cached(key):
+    """
+    Memoize an async tool for the duration of the current request.
+
+    Args:
+        key: Callable building the cache key from the tool arguments
 
+    Returns:
+        Decorator caching the tool task, so concurrent identical calls share one execution
+    """
 
-def lookup_weather(location: str, unit: str = "celsius"):
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            cache = _tool_cache.get()
+            if cache is None:
+                return await func(*args, **kwargs)
+
+            cache_key = (func.__name__, key(*args, **kwargs))
+            if cache_key not in cache:
+                cache[cache_key] = asyncio.ensure_future(func(*args, **kwargs))
+            return await cache[cache_key]
+
+        return wrapper
+
+    return decorator
+
+
+@request_cached(key=lambda location, unit="celsius": (location, unit))
+async def lookup_weather(location: str, unit: str = "celsius"):
     # Dummy implementation
     return {
         "location": location,
@@ -53,29 +59,28 @@ def lookup_weather(location: str, unit: str = "celsius"):
     }
 
 
-def lookup_location(city: str):
-    """Dummy geocoding tool."""
-    database = {
-        "sydney": {"lat": -33.8688, "lng": 151.2093, "country": "Australia"},
-        "tokyo": {"lat": 35.6762, "lng": 139.6503, "country": "Japan"},
-        "new york": {"lat": 40.7128, "lng": -74.0060, "country": "USA"},
-    }
+# Read-only city database keyed by casefolded name, built once at import
+LOCATION_DATABASE = MappingProxyType({
+    "sydney": {"lat": -33.8688, "lng": 151.2093, "country": "Australia"},
+    "tokyo": {"lat": 35.6762, "lng": 139.6503, "country": "Japan"},
+    "new york": {"lat": 40.7128, "lng": -74.0060, "country": "USA"},
+})
 
-    key = city.lower().strip()
-    if key in database:
-        return database[key]
-    else:
+
+@request_cached(key=lambda city: city.casefold().strip())
+async def lookup_location(city: str):
+    """Dummy geocoding tool."""
+    location = LOCATION_DATABASE.get(city.casefold().strip())
+    if location is None:
         return {"error": f"City '{city}' not found in database."}
+    return location
 
 
-agent = OpenAIClient()
 messages = [
     {"role": "system", "content": "You are a weather assistant that uses emojis."},
     {"role": "user", "content": "What's the weather and location in Sydney?"},
 ]
 
-panel_title = f"Tools Multiple Parallel - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
-
 # Map function names to actual functions
 available_functions = {
     "lookup_weather": lookup_weather,
@@ -83,78 +88,30 @@ available_functions = {
 }
 
 
-def main():
+async def main(agent: AsyncOpenAIClient):
     """ Run the agent with tools. """
+    panel_title = f"Tools Multiple Parallel - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
 
-    print_request(messages, title=panel_title)
-
-    agent_response = wait_for_response(agent.client.chat.completions.create(
-        model=agent.model,
-        temperature=0.7,
-        messages=messages,
-        tools=tools,
-        tool_choice="auto",
-        # parallel_tool_calls=False, <----- Disable sequential tool calls
-    ))
-
-    print_response(agent_response)
-
-    # Handle tool calls if any
-    if agent_response.choices[0].message.tool_calls:
-        tool_call = agent_response.choices[0].message.tool_calls
-
-        # Append the assistant's message with the tool call to the messages
-        messages.append(agent_response.choices[0].message)
-
-        # Execute tool calls in parallel
-        with ThreadPoolExecutor() as executor:
-            futures = []
-
-            # Loop through each tool call
-            for call in tool_call:
-                # Get the function name and arguments
-                function_name = call.function.name
-                args = json.loads(call.function.arguments)
-
-                rich.print(f"Tool request: {function_name}({args})")
-
-                # Submit the function to be executed in parallel
-                if function_name in available_functions:
-                    func = available_functions[function_name]
-                    future = executor.submit(func, **args)
-
-                    # Store the future along with tool call and function name
-                    futures.append((call, function_name, future))
-                else:
-                    rich.print(f"[red]Function '{function_name}' not found.[/red]")
-
-            # Add each tool result to the conversation
-            for tool_call, function_name, future in futures:
-                result = future.result()
-                messages.append(
-                    {
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": json.dumps(result),
-                    }
-                )
-
-        rich.print("\n[bold green]Tool results added to the conversation.[/bold green]\n")
-
-        # Get final response from the model with all tool results
-        final_response = wait_for_response(agent.client.chat.completions.create(
-            model=agent.model,
-            temperature=0.7,
-            messages=messages,
-            tools=tools,
-            tool_choice="auto",
-        ))
-
-        # Display the final response
-        print_response(final_response)
-    else:
-        rich.print(agent_response.choices[0].message.content)
+    final_response = await run_parallel_tools(agent, messages, tools, available_functions, title=panel_title)
+
+    # Display the final response
+    print_response(final_response)
+
+
+async def run():
+    agent = AsyncOpenAIClient()  # <----- Use async agent client
+    token = _tool_cache.set({})
+    try:
+        await main(agent)
+    finally:
+        _tool_cache.reset(token)
+        await agent.client.close()
 
 
 if __name__ == "__main__":
-    main()
+    if sys.platform != "win32":
+        import uvloop
+
+        asyncio.run(run(), loop_factory=uvloop.new_event_loop)  # <----- Faster event loop (Linux/macOS)
+    else:
+        asyncio.run(run())
@@ -3,32 +3,18 @@ Basic example of using an agent with tools + streaming.
 Compatible with standard ChatCompletionChunk API.
 """
 
-import json
 
+import orjson
 import rich
 
-from agents.openai.openai_client import OpenAIClient
+from agents.openai.openai_client import OpenAIClient, get_openai_client
 from agents.openai.print_utils import print_request, print_response
 from utils.agent_utils import wait_for_response
 
+from ._tool_schemas import WEATHER_TOOL
+
 # --- Define the tool (function) ---
-tools = [
-    {
-        "type": "function",
-        "function": {
-            "name": "lookup_weather",
-            "description": "Get the current weather for a location.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "location": {"type": "string"},
-                    "unit": {"type": "string", "enum": ["celsius", "fahrenheit"]},
-                },
-                "required": ["location"],
-            },
-        },
-    }
-]
+tools = (WEATHER_TOOL,)
 
 
 def lookup_weather(location: str, unit: str = "celsius"):
@@ -40,23 +26,19 @@ def lookup_weather(location: str, unit: str = "celsius"):
     }
 
 
-agent = OpenAIClient()
 messages = [
     {"role": "system", "content": "You are a weather bot using emojis."},
     {"role": "user", "content": "What's the weather in Tokyo?"},
 ]
-panel_title = (
-    f"Tools Stream - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
-)
 available_functions = {"lookup_weather": lookup_weather}
 
 
 # -----------------------------------------------------------------------------
-def stream_with_tools(messages):
+def stream_with_tools(agent: OpenAIClient, messages: list, panel_title: str):
 
     print_request(messages, title=panel_title)
 
-    stream = wait_for_response(agent.client.chat.completions.create(
+    stream = wait_for_response(lambda: agent.client.chat.completions.create(
         model=agent.model,
         temperature=0.7,
         messages=messages,
@@ -119,8 +101,11 @@ def stream_with_tools(messages):
 
 # -----------------------------------------------------------------------------
 def main():
+    agent = get_openai_client()
+    panel_title = f"Tools Stream - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
+
     # Step 1 — Stream first reply and detect tool calls
-    response = stream_with_tools(messages)
+    response = stream_with_tools(agent, messages, panel_title)
 
     tool_call = response["tool_call"]
     if not tool_call["name"]:
@@ -146,7 +131,7 @@ def main():
     )
 
     # Step 3 — Execute tool calls
-    call_args = json.loads(tool_call["arguments"])
+    call_args = orjson.loads(tool_call["arguments"])
     func = available_functions[tool_call["name"]]
     result = func(**call_args)
 
@@ -154,7 +139,7 @@ def main():
         {
             "role": "tool",
             "tool_call_id": tool_call["id"],
-            "content": json.dumps(result),
+            "content": orjson.dumps(result).decode(),
         }
     )
 
@@ -163,7 +148,7 @@ def main():
 
     print_request(messages, title=panel_title)
 
-    followup = wait_for_response(agent.client.chat.completions.create(
+    followup = wait_for_response(lambda: agent.client.chat.completions.create(
         model=agent.model,
         temperature=0.7,
         messages=messages,
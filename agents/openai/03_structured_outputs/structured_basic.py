@@ -2,12 +2,10 @@
 Structured Outputs Basic: Extract structured data from text using JSON Schema.
 """
 
-from agents.openai.openai_client import OpenAIClient
+from agents.openai.openai_client import get_openai_client
 from agents.openai.print_utils import print_request, print_response
 from utils.agent_utils import wait_for_response
 
-agent = OpenAIClient()
-panel_title = f"Structured Outputs Basic - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
 json_schema = {
     "name": "PersonInfo",
     "strict": True,
@@ -23,24 +21,28 @@ json_schema = {
     },
 }
 text_to_parse = "Información: Bob Fronz, 29 year old, bob.f@example.com."
-messages = [
-    {
-        "role": "system",
-        "content": "You are an assistant that helps with structured data. Extract name, age, and email from the text and return as JSON.",
-    },
-    {
-        "role": "user",
-        "content": f"Extract name, age and email from this text: {text_to_parse}",
-    },
-]
+system_message = {
+    "role": "system",
+    "content": "You are an assistant that helps with structured data. Extract name, age, and email from the text and return as JSON.",
+}
+user_message_template = "Extract name, age and email from this text: {text}"
+
+
+def build_messages(text: str) -> list[dict]:
+    """Build the conversation for a text, reusing the shared system message."""
+    return [system_message, {"role": "user", "content": user_message_template.format(text=text)}]
 
 
 def main():
     """ Extract structured data from text using JSON Schema. """
+    agent = get_openai_client()
+    panel_title = f"Structured Outputs Basic - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
+
+    messages = build_messages(text_to_parse)
 
     print_request(messages, title=panel_title)
 
-    agent_response = wait_for_response(agent.client.chat.completions.create(
+    agent_response = wait_for_response(lambda: agent.client.chat.completions.create(
         model=agent.model,
         temperature=0.7,
         messages=messages,
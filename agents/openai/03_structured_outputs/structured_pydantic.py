@@ -2,29 +2,22 @@
 Structured Outputs Pydantic: Extract structured data from text using Pydantic models.
 """
 
+import openai
 import rich
 from pydantic import BaseModel
 
-from agents.openai.openai_client import OpenAIClient
+from agents.openai.openai_client import OpenAIClient, get_openai_client
 from agents.openai.print_utils import print_request, print_response
 from utils.agent_utils import wait_for_response
 
-agent = OpenAIClient()
-panel_title = f"Structured Outputs Pydantic - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
-
-text_to_parse = (
-    "Information: Mr Bob Fronz, 29 year old, bob.f@example.com, born on 1994-04-15."
-)
-messages = [
-    {
-        "role": "system",
-        "content": "You are an assistant that helps with structured data. Extract name, age, and email from the text and return as JSON.",
-    },
-    {
-        "role": "user",
-        "content": f"Extract name, age and email from this text: {text_to_parse}",
-    },
+texts_to_parse = [
+    "Information: Mr Bob Fronz, 29 year old, bob.f@example.com, born on 1994-04-15.",
+    "Contact: Ms Alice Wong, 34 years old, reachable at alice.wong@example.com.",
 ]
+system_message = {
+    "role": "system",
+    "content": "You are an assistant that helps with structured data. Extract name, age, and email from the text and return as JSON.",
+}
 
 
 class PersonInfo(BaseModel):
@@ -33,15 +26,55 @@ class PersonInfo(BaseModel):
     email: str
 
 
-def main():
+class PersonBatch(BaseModel):
+    items: list[PersonInfo]
+
+
+# JSON schema built once at import instead of on every parse() call
+PERSON_BATCH_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "PersonBatch",
+        "strict": True,
+        "schema": openai.pydantic_function_tool(PersonBatch)["function"]["parameters"],
+    },
+}
+
 
-    print_request(messages, title=panel_title)
+def extract_many(agent: OpenAIClient, texts: list[str], title: str = "Agent Messages") -> list[PersonInfo]:
+    """
+    Extract a PersonInfo for each text using a single chat completion.
 
-    agent_response = wait_for_response(agent.client.chat.completions.parse(
+    Args:
+        agent: The OpenAI client wrapper to use
+        texts: The texts to extract the person information from
+        title: Title of the request panel
+
+    Returns:
+        list[PersonInfo]: One entry per text, in the same order as the input
+
+    Raises:
+        ValueError: If the model returns a different number of entries than texts
+    """
+    numbered_texts = "\n".join(f"{index}. {text}" for index, text in enumerate(texts, start=1))
+    messages = [
+        system_message,
+        {
+            "role": "user",
+            "content": (
+                "Extract name, age and email for each of the following texts "
+                f"and return them as a list preserving the order:\n{numbered_texts}"
+            ),
+        },
+    ]
+
+    print_request(messages, title=title)
+
+    agent_response = wait_for_response(lambda: agent.client.chat.completions.create(
         model=agent.model,
         temperature=0.7,
         messages=messages,
-        response_format=PersonInfo,  # <----- Use the Pydantic model here
+        response_format=PERSON_BATCH_FORMAT,  # <----- Use the precomputed JSON schema here
     ))
 
     print_response(agent_response)
@@ -49,9 +82,19 @@ def main():
     message = agent_response.choices[0].message
     if message.refusal:
         rich.print(message.refusal)
-    else:
-        event = message.parsed
-        rich.print(event)
+        return []
+    people = PersonBatch.model_validate_json(message.content).items
+    if len(people) != len(texts):
+        raise ValueError(f"Expected {len(texts)} extracted people, the model returned {len(people)}")
+    return people
+
+
+def main():
+    agent = get_openai_client()
+    panel_title = f"Structured Outputs Pydantic - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
+
+    people = extract_many(agent, texts_to_parse, title=panel_title)
+    rich.print(people)
 
 
 if __name__ == "__main__":
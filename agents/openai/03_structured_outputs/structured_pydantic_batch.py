@@ -0,0 +1,136 @@
+"""
+Structured Outputs Batch: Bulk person extraction through the OpenAI Batch API.
+
+Batch jobs are billed at a discount and use a separate rate-limit pool, at the cost of
+completing asynchronously (within 24h). Use the synchronous scripts for low latency.
+The Batch API is available with the openai and azure providers.
+
+To run this example:
+    uv run python -m agents.openai.03_structured_outputs.structured_pydantic_batch
+"""
+
+import time
+
+import openai
+import orjson
+import rich
+from openai import OpenAI
+
+from agents.openai.openai_client import get_openai_client
+
+from .structured_pydantic import PersonInfo, system_message, texts_to_parse
+
+PERSON_INFO_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "PersonInfo",
+        "strict": True,
+        "schema": openai.pydantic_function_tool(PersonInfo)["function"]["parameters"],
+    },
+}
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def submit_extraction(client: OpenAI, texts: list[str], model: str) -> str:
+    """
+    Submit one extraction request per text as a batch job.
+
+    Args:
+        client: The OpenAI client to use
+        texts: The texts to extract the person information from
+        model: The model to run the batch with
+
+    Returns:
+        str: The batch id; each request uses the index of its text as custom_id
+    """
+    lines = [
+        orjson.dumps({
+            "custom_id": str(index),
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": model,
+                "messages": [
+                    system_message,
+                    {"role": "user", "content": f"Extract name, age and email from this text: {text}"},
+                ],
+                "response_format": PERSON_INFO_FORMAT,
+            },
+        })
+        for index, text in enumerate(texts)
+    ]
+
+    batch_file = client.files.create(file=("extraction.jsonl", b"\n".join(lines)), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h",
+    )
+    return batch.id
+
+
+def poll_batch(client: OpenAI, batch_id: str, initial_delay: float = 5.0, max_delay: float = 300.0):
+    """
+    Wait for a batch job to finish, backing off exponentially between checks.
+
+    Args:
+        client: The OpenAI client to use
+        batch_id: The batch to wait for
+        initial_delay: Seconds to wait before the first re-check
+        max_delay: Upper bound for the wait between checks
+
+    Returns:
+        Batch: The batch in its terminal status
+    """
+    delay = initial_delay
+    batch = client.batches.retrieve(batch_id)
+    while batch.status not in TERMINAL_STATUSES:
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+        batch = client.batches.retrieve(batch_id)
+    return batch
+
+
+def fetch_results(client: OpenAI, batch) -> dict[int, PersonInfo]:
+    """
+    Download and validate the results of a completed batch.
+
+    Args:
+        client: The OpenAI client to use
+        batch: The completed batch returned by poll_batch
+
+    Returns:
+        dict[int, PersonInfo]: Extracted person keyed by the index of its input text
+    """
+    if batch.output_file_id is None:
+        return {}
+
+    results = {}
+    for line in client.files.content(batch.output_file_id).content.splitlines():
+        record = orjson.loads(line)
+        response = record.get("response") or {}
+        if response.get("status_code") != 200:
+            continue
+        message = response["body"]["choices"][0]["message"]
+        if message.get("content"):
+            results[int(record["custom_id"])] = PersonInfo.model_validate_json(message["content"])
+    return results
+
+
+def main():
+    agent = get_openai_client()
+    rich.print(f"Structured Outputs Batch - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})")
+
+    batch_id = submit_extraction(agent.client, texts_to_parse, agent.model)
+    rich.print(f"Submitted batch {batch_id}, waiting for it to complete...")
+    batch = poll_batch(agent.client, batch_id)
+    rich.print(f"Batch {batch_id} finished with status: {batch.status}")
+
+    people = fetch_results(agent.client, batch)
+    for index, text in enumerate(texts_to_parse):
+        rich.print(text, people.get(index, "No result"))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,31 +2,30 @@
 Structured Outputs Pydantic: Extract structured data from text using Pydantic models.
 """
 
+import openai
 import rich
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
-from agents.openai.openai_client import OpenAIClient
+from agents.openai.openai_client import get_openai_client
 from agents.openai.print_utils import print_request, print_response
 from utils.agent_utils import wait_for_response
 
-agent = OpenAIClient()
-
-
-panel_title = f"Structured Outputs Pydantic Description - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
-
 text_to_parse = (
     "Information: Mr Bob Fronz, 29 year old, bob.f@example.com, born on 1994-04-15."
 )
-messages = [
-    {
-        "role": "system",
-        "content": "You are an assistant that helps with structured data. Extract name, age, email, and birthdate from the text and return as JSON.",
-    },
-    {
-        "role": "user",
-        "content": f"Extract name, age, email, and birthdate from this text: {text_to_parse}",
-    },
-]
+system_message = {
+    "role": "system",
+    "content": (
+        "You are an assistant that helps with structured data. "
+        "Extract name, age, email, and birthdate from the text and return as JSON."
+    ),
+}
+user_message_template = "Extract name, age, email, and birthdate from this text: {text}"
+
+
+def build_messages(text: str) -> list[dict]:
+    """Build the conversation for a text, reusing the shared system message."""
+    return [system_message, {"role": "user", "content": user_message_template.format(text=text)}]
 
 
 class PersonInfo(BaseModel):
@@ -37,15 +36,33 @@ class PersonInfo(BaseModel):
     birthdate: str = Field(..., description="A date in the format YYYY-MM-DD")
 
 
+# JSON schema built once at import instead of on every parse() call
+PERSON_INFO_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "PersonInfo",
+        "strict": True,
+        "schema": openai.pydantic_function_tool(PersonInfo)["function"]["parameters"],
+    },
+}
+PERSON_INFO_ADAPTER = TypeAdapter(PersonInfo)
+
+
 def main():
+    agent = get_openai_client()
+    panel_title = (
+        f"Structured Outputs Pydantic Description - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
+    )
+
+    messages = build_messages(text_to_parse)
 
     print_request(messages, title=panel_title)
 
-    agent_response = wait_for_response(agent.client.chat.completions.parse(
+    agent_response = wait_for_response(lambda: agent.client.chat.completions.create(
         model=agent.model,
         temperature=0.7,
         messages=messages,
-        response_format=PersonInfo,  # <----- Use the Pydantic model here
+        response_format=PERSON_INFO_FORMAT,  # <----- Use the precomputed JSON schema here
     ))
 
     print_response(agent_response)
@@ -54,7 +71,7 @@ def main():
     if message.refusal:
         rich.print(message.refusal)
     else:
-        event = message.parsed
+        event = PERSON_INFO_ADAPTER.validate_json(message.content)
         rich.print(event)
 
 
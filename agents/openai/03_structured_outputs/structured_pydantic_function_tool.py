@@ -6,14 +6,10 @@ import openai
 import rich
 from pydantic import BaseModel
 
-from agents.openai.openai_client import OpenAIClient
+from agents.openai.openai_client import get_openai_client
 from agents.openai.print_utils import print_request, print_response
 from utils.agent_utils import wait_for_response
 
-agent = OpenAIClient()
-
-panel_title = f"Structured Outputs Pydantic Function Tool - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
-
 messages = [
     {
         "role": "system",
@@ -31,20 +27,25 @@ class GetJira(BaseModel):
     issue_type: str
 
 
+# Tool schema built once at import instead of on every request
+GET_JIRA_TOOL = openai.pydantic_function_tool(GetJira)
+
+
 def main():
+    agent = get_openai_client()
+    panel_title = (
+        f"Structured Outputs Pydantic Function Tool - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
+    )
 
     print_request(messages, title=panel_title)
 
-    agent_response = (
-        wait_for_response(agent.client.chat.completions.create(  # <----- Use chat completion create to use tools
-            model=agent.model,
-            temperature=0.7,
-            messages=messages,
-            tools=[
-                openai.pydantic_function_tool(GetJira)
-            ],  # <----- Define the tool using the Pydantic model
-        ))
-    )
+    # <----- Use chat completion create to use tools
+    agent_response = wait_for_response(lambda: agent.client.chat.completions.create(
+        model=agent.model,
+        temperature=0.7,
+        messages=messages,
+        tools=[GET_JIRA_TOOL],  # <----- Define the tool using the Pydantic model
+    ))
 
     print_response(agent_response)
 
@@ -2,18 +2,15 @@
 Structured Outputs Pydantic Nested: Extract structured data from text using nested Pydantic models.
 """
 
+import openai
 import rich
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import from_json
 
-from agents.openai.openai_client import OpenAIClient
-from agents.openai.print_utils import print_request, print_response
+from agents.openai.openai_client import get_openai_client
+from agents.openai.print_utils import print_request
 from utils.agent_utils import wait_for_response
 
-agent = OpenAIClient()
-
-
-panel_title = f"Structured Outputs Pydantic Nested - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
-
 messages = [
     {"role": "system", "content": "Extract the event information."},
     {
@@ -34,20 +31,61 @@ class CalendarEvent(BaseModel):
     participants: list[Participant]
 
 
+# JSON schema built once at import instead of on every parse() call
+CALENDAR_EVENT_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "CalendarEvent",
+        "strict": True,
+        "schema": openai.pydantic_function_tool(CalendarEvent)["function"]["parameters"],
+    },
+}
+CALENDAR_EVENT_ADAPTER = TypeAdapter(CalendarEvent)
+
+
 def main():
+    agent = get_openai_client()
+    panel_title = f"Structured Outputs Pydantic Nested - (Agent: {agent.name.upper()} - Model: {agent.model.upper()})"
 
     print_request(messages, title=panel_title)
 
-    agent_response = wait_for_response(agent.client.chat.completions.parse(
+    stream = wait_for_response(lambda: agent.client.chat.completions.create(
         model=agent.model,
         temperature=0.7,
         messages=messages,
-        response_format=CalendarEvent,  # <----- Use the Pydantic model here
+        response_format=CALENDAR_EVENT_FORMAT,  # <----- Use the precomputed JSON schema here
+        stream=True,  # <----- Enable streaming response
     ))
 
-    print_response(agent_response)
-
-    rich.print(agent_response.choices[0].message)
+    content = ""
+    refusal = ""
+    printed_participants = 0
+
+    for event in stream:
+        if not event.choices:
+            continue
+
+        delta = event.choices[0].delta
+        if delta.refusal:
+            refusal += delta.refusal
+        if not delta.content:
+            continue
+        content += delta.content
+
+        # A participant is complete once the next one starts streaming
+        partial = from_json(content, allow_partial=True)
+        participants = partial.get("participants", []) if isinstance(partial, dict) else []
+        for participant in participants[printed_participants:-1]:
+            rich.print(f"[green]Participant:[/green] {Participant.model_validate(participant)}")
+            printed_participants += 1
+
+    if refusal:
+        rich.print(refusal)
+    else:
+        event = CALENDAR_EVENT_ADAPTER.validate_json(content)
+        for participant in event.participants[printed_participants:]:
+            rich.print(f"[green]Participant:[/green] {participant}")
+        rich.print(event)
 
 
 if __name__ == "__main__":
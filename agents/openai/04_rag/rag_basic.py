@@ -100,7 +100,7 @@ def rag_answer(query):
     rich.print(messages)
 
     # 3. Generate response
-    agent_response = wait_for_response(agent.client.chat.completions.parse(
+    agent_response = wait_for_response(lambda: agent.client.chat.completions.parse(
         model=agent.model,
         messages=[
             {"role": "system", "content": system_prompt},
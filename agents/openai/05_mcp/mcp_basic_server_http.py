@@ -10,9 +10,14 @@ To run this example:
 
 Example from https://github.com/Azure-Samples/python-mcp-demos
 """
+import asyncio
+import atexit
 import csv
+import itertools
 import logging
+import operator
 import os
+import sys
 from datetime import date
 from enum import Enum
 from pathlib import Path
@@ -34,7 +39,15 @@ EXPENSES_FILE = SCRIPT_DIR / "expenses.csv"
 
 # Ensure the expenses file exists
 if not EXPENSES_FILE.exists():
-    EXPENSES_FILE.write_text("item,date,amount\n")
+    EXPENSES_FILE.write_text("date,amount,category,description,payment_method\n")
+
+# Append handle opened once; writes are serialized by the lock and flushed per row
+EXPENSES_WRITER = open(EXPENSES_FILE, "ab", buffering=1 << 16)
+atexit.register(EXPENSES_WRITER.close)
+EXPENSES_WRITE_LOCK = asyncio.Lock()
+CSV_SPECIAL_CHARS = (",", '"', "\n", "\r")
+EXPENSE_COLUMNS = ("date", "amount", "category", "description", "payment_method")
+EXPENSE_LINE_TEMPLATE = "Date: {}, Amount: ${}, Category: {}, Description: {}, Payment: {}\n"
 
 class PaymentMethod(Enum):
     AMEX = "amex"
@@ -50,6 +63,24 @@ class Category(Enum):
     GADGET = "gadget"
     OTHER = "other"
 
+
+# Member -> CSV value lookups, built once instead of resolving .value per call
+CATEGORY_VALUES = {member: member.value for member in Category}
+PAYMENT_METHOD_VALUES = {member: member.value for member in PaymentMethod}
+
+
+def escape_csv_cell(value: str) -> str:
+    """Quote a free-text CSV cell the way csv.writer does, only when it contains special characters."""
+    if any(char in value for char in CSV_SPECIAL_CHARS):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def format_expense_row(date_iso: str, amount: float, category: str, description: str, payment_method: str) -> bytes:
+    """Encode an expense as a CSV row; dates, amounts and enum values never need quoting."""
+    return f"{date_iso},{amount},{category},{escape_csv_cell(description)},{payment_method}\n".encode()
+
+
 @mcp.tool
 async def add_expense(
     date: Annotated[date, "Date of the expense in YYYY-MM-DD format"],
@@ -63,23 +94,21 @@ async def add_expense(
         return "Error: Amount must be positive"
 
     date_iso = date.isoformat()
-    logger.info(f"Adding expense: ${amount} for {description} on {date_iso}")
+    logger.info("Adding expense: $%s for %s on %s", amount, description, date_iso)
 
     try:
-        file_exists = EXPENSES_FILE.exists()
-
-        with open(EXPENSES_FILE, "a", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
+        row = format_expense_row(
+            date_iso, amount, CATEGORY_VALUES[category], description, PAYMENT_METHOD_VALUES[payment_method]
+        )
 
-            if not file_exists:
-                writer.writerow(["date", "amount", "category", "description", "payment_method"])
-
-            writer.writerow([date_iso, amount, category.value, description, payment_method.value])
+        async with EXPENSES_WRITE_LOCK:
+            EXPENSES_WRITER.write(row)
+            EXPENSES_WRITER.flush()
 
         return f"Successfully added expense: ${amount} for {description} on {date_iso}"
 
     except Exception as e:
-        logger.error(f"Error adding expense: {str(e)}")
+        logger.error("Error adding expense: %s", e)
         return "Error: Unable to add expense"
 
 
@@ -90,26 +119,25 @@ async def get_expenses_data():
 
     try:
         with open(EXPENSES_FILE, newline="", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            expenses_data = list(reader)
+            reader = csv.reader(file)
+            header = next(reader, [])
+            # A header without every expense column (empty or legacy) is read in the column order the server writes
+            if not set(EXPENSE_COLUMNS).issubset(header):
+                header = EXPENSE_COLUMNS
+            # Malformed rows with a different number of cells are skipped instead of failing the whole read
+            rows = (row for row in reader if len(row) == len(header))
 
-        csv_content = f"Expense data ({len(expenses_data)} entries):\n\n"
-        for expense in expenses_data:
-            csv_content += (
-                f"Date: {expense['date']}, "
-                f"Amount: ${expense['amount']}, "
-                f"Category: {expense['category']}, "
-                f"Description: {expense['description']}, "
-                f"Payment: {expense['payment_method']}\n"
-            )
+            # Column picking and formatting run in C (itemgetter/starmap), not in a Python-level loop
+            pick_columns = operator.itemgetter(*map(header.index, EXPENSE_COLUMNS))
+            lines = list(itertools.starmap(EXPENSE_LINE_TEMPLATE.format, map(pick_columns, rows)))
 
-        return csv_content
+        return f"Expense data ({len(lines)} entries):\n\n" + "".join(lines)
 
     except FileNotFoundError:
         logger.error("Expenses file not found")
         return "Error: Expense data unavailable"
     except Exception as e:
-        logger.error(f"Error reading expenses: {str(e)}")
+        logger.error("Error reading expenses: %s", e)
         return "Error: Unable to retrieve expense data"
 
 @mcp.prompt
@@ -145,9 +173,16 @@ if __name__ == "__main__":
     logger.info("MCP Expenses server starting (HTTP mode on port 8000)")
 
     # Run with HTTP transport
-    mcp.run(
+    server = mcp.run_async(
         transport="streamable-http",
         host="0.0.0.0",
         port=int(os.getenv("PORT", "8000")),
         show_banner=os.getenv("SHOW_BANNER", "true").lower() == "true",
     )
+
+    if sys.platform != "win32":
+        import uvloop
+
+        asyncio.run(server, loop_factory=uvloop.new_event_loop)  # <----- Faster event loop (Linux/macOS)
+    else:
+        asyncio.run(server)
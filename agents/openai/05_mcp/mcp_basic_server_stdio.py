@@ -55,8 +55,14 @@ Note:
 
 Example from https://github.com/Azure-Samples/python-mcp-demos
 """
+import asyncio
+import atexit
 import csv
+import functools
+import itertools
 import logging
+import operator
+import os
 from datetime import date
 from enum import Enum
 from pathlib import Path
@@ -77,7 +83,17 @@ EXPENSES_FILE = SCRIPT_DIR / "expenses.csv"
 
 # Ensure the expenses file exists
 if not EXPENSES_FILE.exists():
-    EXPENSES_FILE.write_text("item,date,amount\n")
+    EXPENSES_FILE.write_text("date,amount,category,description,payment_method\n")
+
+# Append handle opened once; writes are serialized by the lock and flushed per row,
+# so an acknowledged expense is on disk even if the process is killed
+EXPENSES_WRITER = open(EXPENSES_FILE, "ab", buffering=1 << 16)
+EXPENSES_WRITE_LOCK = asyncio.Lock()
+CSV_SPECIAL_CHARS = (",", '"', "\n", "\r")
+EXPENSE_COLUMNS = ("date", "amount", "category", "description", "payment_method")
+EXPENSE_LINE_TEMPLATE = "Date: {}, Amount: ${}, Category: {}, Description: {}, Payment: {}\n"
+EXPENSES_VIEW = {"size": -1, "lines": [], "content": None}  # Formatted rows and the file size they cover
+atexit.register(EXPENSES_WRITER.close)
 
 class PaymentMethod(Enum):
     AMEX = "amex"
@@ -93,6 +109,31 @@ class Category(Enum):
     GADGET = "gadget"
     OTHER = "other"
 
+
+# Member -> CSV value lookups, built once instead of resolving .value per call
+CATEGORY_VALUES = {member: member.value for member in Category}
+PAYMENT_METHOD_VALUES = {member: member.value for member in PaymentMethod}
+
+
+def escape_csv_cell(value: str) -> str:
+    """Quote a free-text CSV cell the way csv.writer does, only when it contains special characters."""
+    if any(char in value for char in CSV_SPECIAL_CHARS):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def format_expense_row(date_iso: str, amount: float, category: str, description: str, payment_method: str) -> bytes:
+    """Encode an expense as a CSV row; dates, amounts and enum values never need quoting."""
+    return f"{date_iso},{amount},{category},{escape_csv_cell(description)},{payment_method}\n".encode()
+
+
+def format_expense_line(
+    date_iso: str, amount: float | str, category: str, description: str, payment_method: str
+) -> str:
+    """Render an expense as a line of the expenses resource."""
+    return EXPENSE_LINE_TEMPLATE.format(date_iso, amount, category, description, payment_method)
+
+
 @mcp.tool
 async def add_expense(
     date: Annotated[date, "Date of the expense in YYYY-MM-DD format"],
@@ -106,60 +147,95 @@ async def add_expense(
         return "Error: Amount must be positive"
 
     date_iso = date.isoformat()
-    logger.info(f"Adding expense: ${amount} for {description} on {date_iso}")
+    category_value = CATEGORY_VALUES[category]
+    payment_method_value = PAYMENT_METHOD_VALUES[payment_method]
+    logger.info("Adding expense: $%s for %s on %s", amount, description, date_iso)
 
     try:
-        file_exists = EXPENSES_FILE.exists()
-
-        with open(EXPENSES_FILE, "a", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-
-            if not file_exists:
-                writer.writerow(["date", "amount", "category", "description", "payment_method"])
-
-            writer.writerow([date_iso, amount, category.value, description, payment_method.value])
+        row = format_expense_row(date_iso, amount, category_value, description, payment_method_value)
+
+        async with EXPENSES_WRITE_LOCK:
+            # Extend the cached view in place when it already covers everything written so far,
+            # so the next read does not have to re-parse the whole CSV
+            in_sync = EXPENSES_VIEW["size"] == EXPENSES_WRITER.tell()
+            EXPENSES_WRITER.write(row)
+            EXPENSES_WRITER.flush()
+            if in_sync:
+                EXPENSES_VIEW["lines"].append(
+                    format_expense_line(date_iso, amount, category_value, description, payment_method_value)
+                )
+                EXPENSES_VIEW["size"] = EXPENSES_WRITER.tell()
+                EXPENSES_VIEW["content"] = None
 
         return f"Successfully added expense: ${amount} for {description} on {date_iso}"
 
     except Exception as e:
-        logger.error(f"Error adding expense: {str(e)}")
+        logger.error("Error adding expense: %s", e)
         return "Error: Unable to add expense"
 
+def load_expenses_lines(size: int) -> list[str]:
+    """Read the expenses file and format every row."""
+    if size == 0:
+        return []
+
+    with open(EXPENSES_FILE, newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        # A header without every expense column (empty or legacy) is read in the column order the server writes
+        if not set(EXPENSE_COLUMNS).issubset(header):
+            header = EXPENSE_COLUMNS
+        # Malformed rows with a different number of cells are skipped instead of failing the whole read
+        rows = (row for row in reader if len(row) == len(header))
+
+        # Column picking and formatting run in C (itemgetter/starmap), not in a Python-level loop
+        pick_columns = operator.itemgetter(*map(header.index, EXPENSE_COLUMNS))
+        return list(itertools.starmap(EXPENSE_LINE_TEMPLATE.format, map(pick_columns, rows)))
+
+
 @mcp.resource("resource://expenses")
 async def get_expenses_data():
     """Get raw expense data from CSV file"""
     logger.info("Expenses data accessed")
 
     try:
-        with open(EXPENSES_FILE, newline="", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            expenses_data = list(reader)
-
-        csv_content = f"Expense data ({len(expenses_data)} entries):\n\n"
-        for expense in expenses_data:
-            csv_content += (
-                f"Date: {expense['date']}, "
-                f"Amount: ${expense['amount']}, "
-                f"Category: {expense['category']}, "
-                f"Description: {expense['description']}, "
-                f"Payment: {expense['payment_method']}\n"
-            )
-
-        return csv_content
+        # Only re-read the file when it was changed outside of add_expense
+        size = os.stat(EXPENSES_FILE).st_size
+        if size != EXPENSES_VIEW["size"]:
+            EXPENSES_VIEW["lines"] = load_expenses_lines(size)
+            EXPENSES_VIEW["size"] = size
+            EXPENSES_VIEW["content"] = None
+
+        if EXPENSES_VIEW["content"] is None:
+            lines = EXPENSES_VIEW["lines"]
+            EXPENSES_VIEW["content"] = f"Expense data ({len(lines)} entries):\n\n" + "".join(lines)
+
+        return EXPENSES_VIEW["content"]
 
     except FileNotFoundError:
         logger.error("Expenses file not found")
         return "Error: Expense data unavailable"
     except Exception as e:
-        logger.error(f"Error reading expenses: {str(e)}")
+        logger.error("Error reading expenses: %s", e)
         return "Error: Unable to retrieve expense data"
 
-@mcp.prompt
-def analyze_spending_prompt(
-    category: str | None = None, start_date: str | None = None, end_date: str | None = None
-) -> str:
-    """Generate a prompt to analyze spending patterns with optional filters."""
+# Invariant prompt body, only the filter text changes between requests
+ANALYZE_SPENDING_TEMPLATE = """
+    Please analyze my spending patterns{filter_text} and provide:
 
+    1. Total spending breakdown by category
+    2. Average daily/weekly spending
+    3. Most expensive single transaction
+    4. Payment method distribution
+    5. Spending trends or unusual patterns
+    6. Recommendations for budget optimization
+
+    Use the expense data to generate actionable insights.
+    """
+
+
+@functools.lru_cache(maxsize=64)
+def build_spending_prompt(category: str | None, start_date: str | None, end_date: str | None) -> str:
+    """Render the spending analysis prompt, reusing it for repeated filter combinations."""
     filters = []
     if category:
         filters.append(f"Category: {category}")
@@ -170,18 +246,15 @@ def analyze_spending_prompt(
 
     filter_text = f" ({', '.join(filters)})" if filters else ""
 
-    return f"""
-    Please analyze my spending patterns{filter_text} and provide:
+    return ANALYZE_SPENDING_TEMPLATE.format(filter_text=filter_text)
 
-    1. Total spending breakdown by category
-    2. Average daily/weekly spending
-    3. Most expensive single transaction
-    4. Payment method distribution
-    5. Spending trends or unusual patterns
-    6. Recommendations for budget optimization
 
-    Use the expense data to generate actionable insights.
-    """
+@mcp.prompt
+def analyze_spending_prompt(
+    category: str | None = None, start_date: str | None = None, end_date: str | None = None
+) -> str:
+    """Generate a prompt to analyze spending patterns with optional filters."""
+    return build_spending_prompt(category, start_date, end_date)
 
 
 if __name__ == "__main__":
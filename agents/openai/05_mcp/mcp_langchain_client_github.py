@@ -5,15 +5,23 @@ reference: https://github.com/Azure-Samples/python-mcp-demo/tree/main
 """
 
 import asyncio
+import hashlib
 import logging
 import os
+import re
+import time
 from datetime import datetime
+from pathlib import Path
 
+import httpx
+import orjson
 from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
 from langchain_openai import ChatOpenAI
+from mcp.types import Tool
 from pydantic import SecretStr
 from rich import print
 
@@ -22,34 +30,82 @@ load_dotenv(override=True)
 
 # MCP server URL
 MCP_SERVER_URL = "https://api.githubcopilot.com/mcp/"
+GITHUB_CONNECTION = {
+    "url": MCP_SERVER_URL,
+    "transport": "streamable_http",
+    "headers": {"Authorization": f"Bearer {os.environ['GITHUB_TOKEN']}"},
+}
+MCP_SERVERS = {"github": GITHUB_CONNECTION}
+
+# Tool definitions are cached on disk, keyed by server URL, and refreshed after the TTL
+TOOLS_CACHE_DIR = Path.home() / ".cache" / "mcp"
+TOOLS_CACHE_TTL = 3600  # seconds
+
+# Tool filters: only read operations are exposed to the agent
+SAFE_TOOL_NAMES = frozenset({"search_repositories", "search_code"})
+IS_BLOCKED_TOOL = re.compile(r"create|update|fork").search
+
+# Shared HTTP/2 client so every model call of the agent reuses the same kept-alive connection
+http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=20),
+    timeout=60,
+)
 base_model = ChatOpenAI(
     model=os.getenv("GITHUB_MODEL", "gpt-4o"),
     base_url=os.getenv("GITHUB_API_URL", "https://models.github.ai/inference"),
     api_key=SecretStr(os.environ["GITHUB_TOKEN"]),
+    http_async_client=http_client,  # <----- Reuse connections across the agent model calls
 )
 
 
+async def get_cached_tools(mcp_client: MultiServerMCPClient, server_name: str, url: str) -> list[Tool]:
+    """
+    Get the MCP tool definitions of a server, listing them only when the disk cache is stale.
+
+    Args:
+        mcp_client: The MCP client holding the server connection
+        server_name: Name of the server in the MCP client configuration
+        url: URL of the server, used as the cache key
+
+    Returns:
+        list[Tool]: The raw MCP tool definitions exposed by the server
+    """
+    cache_file = TOOLS_CACHE_DIR / f"{hashlib.sha1(url.encode()).hexdigest()}.json"
+    if cache_file.exists() and time.time() - cache_file.stat().st_mtime < TOOLS_CACHE_TTL:
+        return [Tool.model_validate(tool) for tool in orjson.loads(cache_file.read_bytes())]
+
+    async with mcp_client.session(server_name) as session:
+        tools = (await session.list_tools()).tools
+
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    cache_file.write_bytes(orjson.dumps([tool.model_dump(mode="json", exclude_none=True) for tool in tools]))
+    return tools
+
+
 async def run_agent() -> None:
     """
     Run an agent that uses the MCP client to interact with the Github MCP server.
     """
 
     # Initialize MCP client
-    mcp_client = MultiServerMCPClient({
-        "github": {
-            "url": "https://api.githubcopilot.com/mcp/",
-            "transport": "streamable_http",
-            "headers": {"Authorization": f"Bearer {os.environ['GITHUB_TOKEN']}"},
-        }
-    })
-
-    # Get tools
-    all_tools = await mcp_client.get_tools()
+    mcp_client = MultiServerMCPClient(MCP_SERVERS)
+
+    # Get tools, listing every server concurrently so the wall time is the slowest server, not the sum
+    tools_per_server = await asyncio.gather(*(
+        get_cached_tools(mcp_client, server_name, connection["url"])  # <----- Cached tool definitions
+        for server_name, connection in MCP_SERVERS.items()
+    ))
+    all_tools = [t for tools in tools_per_server for t in tools]
     print(f"[dim]Total tools available: {len(all_tools)}[/dim]\n")
 
-    # Filter to ONLY read operations
-    safe_tool_names = ['search_repositories', 'search_code']
-    filtered_tools = [t for t in all_tools if t.name in safe_tool_names]
+    # Filter to ONLY read operations, converting only the tools the agent will use
+    filtered_tools = [
+        convert_mcp_tool_to_langchain_tool(None, t, connection=connection)
+        for connection, tools in zip(MCP_SERVERS.values(), tools_per_server)
+        for t in tools
+        if t.name in SAFE_TOOL_NAMES
+    ]
 
     # Show filtered tools
     print("[bold cyan]Filtered Tools (read-only):[/bold cyan]")
@@ -57,7 +113,7 @@ async def run_agent() -> None:
         print(f"  ✓ {tool.name}")
     
     # Show what was filtered out
-    blocked_tools = [t for t in all_tools if 'create' in t.name or 'update' in t.name or 'fork' in t.name]
+    blocked_tools = [t for t in all_tools if IS_BLOCKED_TOOL(t.name)]
     if blocked_tools:
         print(f"\n[dim]Blocked tools ({len(blocked_tools)}): " + ", ".join([t.name for t in blocked_tools[:5]]) + "...[/dim]")
 
@@ -87,5 +143,12 @@ async def run_agent() -> None:
         print(f"[bold red]Error:[/bold red] {str(e)}\n")
 
 
+async def main() -> None:
+    try:
+        await run_agent()
+    finally:
+        await http_client.aclose()
+
+
 if __name__ == "__main__":
-    asyncio.run(run_agent())
+    asyncio.run(main())
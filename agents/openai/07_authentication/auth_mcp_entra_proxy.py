@@ -4,9 +4,15 @@ Expense tracking MCP server with authentication.
 Azure (Microsoft Entra ID) OAuth 🤝 FastMCP: https://gofastmcp.com/integrations/azure
 """
 
+import asyncio
+import atexit
 import csv
+import hashlib
 import logging
+import operator
 import os
+import sqlite3
+import weakref
 from datetime import date
 from enum import Enum
 from pathlib import Path
@@ -17,6 +23,7 @@ from fastmcp import Context, FastMCP
 from fastmcp.server.auth.providers.azure import AzureProvider
 from fastmcp.server.dependencies import get_access_token
 from fastmcp.server.middleware import Middleware, MiddlewareContext
+from fastmcp.server.middleware.rate_limiting import RateLimitingMiddleware
 from key_value.aio.stores.memory import MemoryStore
 from rich.console import Console
 from rich.logging import RichHandler
@@ -43,6 +50,53 @@ logger.setLevel(logging.INFO)
 # Define constants
 SCRIPT_DIR = Path(__file__).parent
 EXPENSES_FILE = SCRIPT_DIR / "expenses.csv"
+EXPENSES_DB = SCRIPT_DIR / "expenses.db"
+EXPENSE_COLUMNS = ("date", "amount", "category", "description", "payment_method", "user_id")
+
+# Rows are queued by add_user_expense and inserted in batches by a single background flusher task
+EXPENSES_QUEUE: asyncio.Queue[tuple[tuple, asyncio.Future]] = asyncio.Queue()
+EXPENSES_BATCH_SIZE = 128  # rows
+EXPENSES_BATCH_WINDOW = 0.05  # seconds
+expenses_flusher: asyncio.Task | None = None
+
+
+def open_expenses_db() -> sqlite3.Connection:
+    """
+    Open the expenses database, creating it from the expenses CSV file on first use.
+
+    Returns:
+        sqlite3.Connection: Connection in WAL mode, so reads do not block the batched inserts
+    """
+    conn = sqlite3.connect(EXPENSES_DB, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    with conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS expenses("
+            "date TEXT, amount REAL, category TEXT, description TEXT, payment_method TEXT, user_id TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_user ON expenses(user_id)")
+
+        # Import the CSV sample data once, when the table is still empty
+        if EXPENSES_FILE.exists() and conn.execute("SELECT 1 FROM expenses LIMIT 1").fetchone() is None:
+            with open(EXPENSES_FILE, newline="", encoding="utf-8") as file:
+                reader = csv.reader(file)
+                header = next(reader, [])
+                # A header without every expense column is read in the column order of EXPENSE_COLUMNS,
+                # and malformed rows with a different number of cells are skipped
+                if not set(EXPENSE_COLUMNS).issubset(header):
+                    header = EXPENSE_COLUMNS
+                rows = (row for row in reader if len(row) == len(header))
+                pick_columns = operator.itemgetter(*map(header.index, EXPENSE_COLUMNS))
+                conn.executemany("INSERT INTO expenses VALUES (?, ?, ?, ?, ?, ?)", map(pick_columns, rows))
+    return conn
+
+
+# Per-user reads are an index lookup on user_id instead of a scan of every expense
+EXPENSES_CONN = open_expenses_db()
+atexit.register(EXPENSES_CONN.close)
+# The flusher inserts from a worker thread, on its own connection so reads on the event loop are not blocked
+EXPENSES_WRITE_CONN = sqlite3.connect(EXPENSES_DB, check_same_thread=False)
+atexit.register(EXPENSES_WRITE_CONN.close)
 
 # Configure authentication provider
 # Azure/Entra ID authentication using AzureProvider and Entra Proxy
@@ -59,29 +113,75 @@ auth = AzureProvider(
 
 logger.info("Using Entra OAuth Proxy for server %s and %s storage and client_id", entra_base_url, type(oauth_client_store).__name__)
 
+def get_token_user_id(token=None):
+    """Return the user id claim of the given access token (the request's by default), or None."""
+    if token is None:
+        token = get_access_token()
+    claims = getattr(token, "claims", None)
+    if not claims:
+        return None
+    # Return 'oid' claim if present (for Entra), otherwise fallback to 'sub' (for KeyCloak)
+    return claims.get("oid", claims.get("sub"))
+
+
 # Middleware to populate user_id in per-request context state
 class UserAuthMiddleware(Middleware):
-    def _get_user_id(self):
+    def __init__(self):
+        # Session -> (token hash, user id); the claims are only read again when the session presents another token
+        self._session_user_ids: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _set_user_id(self, context: MiddlewareContext):
+        fastmcp_context = context.fastmcp_context
+        if fastmcp_context is None:
+            return
+
         token = get_access_token()
-        if not (token and hasattr(token, "claims")):
-            return None
-        # Return 'oid' claim if present (for Entra), otherwise fallback to 'sub' (for KeyCloak)
-        return token.claims.get("oid", token.claims.get("sub"))
+        if token is None:
+            fastmcp_context.set_state("user_id", None)
+            return
+
+        session = fastmcp_context.session
+        token_hash = hashlib.sha256(token.token.encode()).digest()
+        cached = self._session_user_ids.get(session)
+        if cached is not None and cached[0] == token_hash:
+            user_id = cached[1]
+        else:
+            user_id = get_token_user_id(token)
+            if user_id is not None:
+                self._session_user_ids[session] = (token_hash, user_id)
+        fastmcp_context.set_state("user_id", user_id)
 
     async def on_call_tool(self, context: MiddlewareContext, call_next):
-        user_id = self._get_user_id()
-        if context.fastmcp_context is not None:
-            context.fastmcp_context.set_state("user_id", user_id)
+        self._set_user_id(context)
         return await call_next(context)
 
     async def on_read_resource(self, context: MiddlewareContext, call_next):
-        user_id = self._get_user_id()
-        if context.fastmcp_context is not None:
-            context.fastmcp_context.set_state("user_id", user_id)
+        self._set_user_id(context)
         return await call_next(context)
 
+def rate_limit_key(context: MiddlewareContext) -> str:
+    """Rate limit per authenticated user, falling back to the MCP session for unauthenticated requests."""
+    fastmcp_context = context.fastmcp_context
+    # UserAuthMiddleware only sets user_id for tool calls and resource reads, other requests
+    # (initialize, list_tools, ...) read the user from the access token
+    user_id = fastmcp_context.get_state("user_id") if fastmcp_context is not None else None
+    if user_id is None:
+        user_id = get_token_user_id()
+    if user_id:
+        return user_id
+    if fastmcp_context is not None and fastmcp_context.session_id:
+        return f"session:{fastmcp_context.session_id}"
+    return "anonymous"
+
+
+# Token-bucket load shedding per user, so a burst of requests cannot flood the database writes
+rate_limit = RateLimitingMiddleware(
+    max_requests_per_second=float(os.getenv("MCP_QPS_LIMIT", "50")),
+    get_client_id=rate_limit_key,
+)
+
 # Create the MCP server
-mcp = FastMCP("Expenses Tracker", auth=auth, middleware=[UserAuthMiddleware()])
+mcp = FastMCP("Expenses Tracker", auth=auth, middleware=[UserAuthMiddleware(), rate_limit])
 
 """Expense tracking MCP server with authentication and Cosmos DB storage."""
 
@@ -98,6 +198,54 @@ class Category(Enum):
     GADGET = "gadget"
     OTHER = "other"
 
+
+# Member -> stored value lookups, built once instead of resolving .value per call
+CATEGORY_VALUES = {member: member.value for member in Category}
+PAYMENT_METHOD_VALUES = {member: member.value for member in PaymentMethod}
+
+
+def insert_expenses(rows: list[tuple]):
+    """Insert rows into the expenses database in one transaction."""
+    with EXPENSES_WRITE_CONN:
+        EXPENSES_WRITE_CONN.executemany("INSERT INTO expenses VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+
+async def flush_expenses():
+    """Insert queued rows into the expenses database, one transaction per batch."""
+    while True:
+        batch = [await EXPENSES_QUEUE.get()]
+        try:
+            async with asyncio.timeout(EXPENSES_BATCH_WINDOW):
+                while len(batch) < EXPENSES_BATCH_SIZE:
+                    batch.append(await EXPENSES_QUEUE.get())
+        except TimeoutError:
+            pass
+
+        # Any failure is reported to the waiting writers, so the flusher keeps running.
+        # Writers that were cancelled meanwhile have a done future and are skipped.
+        try:
+            await asyncio.to_thread(insert_expenses, [row for row, _ in batch])
+        except Exception as e:
+            for _, written in batch:
+                if not written.done():
+                    written.set_exception(e)
+        else:
+            for _, written in batch:
+                if not written.done():
+                    written.set_result(None)
+
+
+async def write_expense(row: tuple):
+    """Queue a row for the background flusher and wait until it is committed."""
+    global expenses_flusher
+    if expenses_flusher is None or expenses_flusher.done():
+        expenses_flusher = asyncio.create_task(flush_expenses())
+
+    written = asyncio.get_running_loop().create_future()
+    await EXPENSES_QUEUE.put((row, written))
+    await written
+
+
 @mcp.tool
 async def add_user_expense(
     date: Annotated[date, "Date of the expense in YYYY-MM-DD format"],
@@ -107,59 +255,49 @@ async def add_user_expense(
     payment_method: Annotated[PaymentMethod, "Payment method used"],
     ctx: Context,
 ):
-    """Add a new expense to the expenses.csv file."""
+    """Add a new expense to the expenses database."""
     if amount <= 0:
         return "Error: Amount must be positive"
 
     date_iso = date.isoformat()
-    logger.info(f"Adding expense: ${amount} for {description} on {date_iso}")
+    category_value = CATEGORY_VALUES[category]
+    payment_method_value = PAYMENT_METHOD_VALUES[payment_method]
+    logger.info("Adding expense: $%s for %s on %s", amount, description, date_iso)
 
     try:
-        file_exists = EXPENSES_FILE.exists()
-
-        with open(EXPENSES_FILE, "a", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-
-            if not file_exists:
-                writer.writerow(["date", "amount", "category", "description", "payment_method", "user_id"])
-
-            writer.writerow([date_iso, amount, category.value, description, payment_method.value, ctx.get_state("user_id")])
+        user_id = ctx.get_state("user_id") or ""
+        await write_expense((date_iso, amount, category_value, description, payment_method_value, user_id))
 
         return f"User {ctx.get_state('user_id')} successfully added expense: ${amount} for {description} on {date_iso}"
 
     except Exception as e:
-        logger.error(f"Error adding expense: {str(e)}")
+        logger.error("Error adding expense: %s", e)
         return "Error: Unable to add expense"
     
 
 @mcp.tool
 async def get_expenses(ctx: Context):
-    """Get the authenticated user's expense data from Cosmos DB."""
+    """Get the authenticated user's expense data from the expenses database."""
 
     try:
-        with open(EXPENSES_FILE, newline="", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            expenses_data = list(reader)
-
-        csv_content = f"Expense data ({len(expenses_data)} entries):\n\n"
-        for expense in expenses_data:
-            if expense["user_id"] != ctx.get_state("user_id"):
-                continue
-            csv_content += (
-                f"date: {expense['date']}, "
-                f"amount: ${expense['amount']}, "
-                f"category: {expense['category']}, "
-                f"description: {expense['description']}, "
-                f"payment_method: {expense['payment_method']},"
-                f"user_id: {expense['user_id']}\n"
-            )
-        return csv_content
-
-    except FileNotFoundError:
-        logger.error("Expenses file not found")
-        return "Error: Expense data unavailable"
+        expenses_data = EXPENSES_CONN.execute(
+            "SELECT date, amount, category, description, payment_method, user_id FROM expenses WHERE user_id = ?",
+            (ctx.get_state("user_id") or "",),
+        )
+
+        lines = [
+            f"date: {expense_date}, "
+            f"amount: ${amount}, "
+            f"category: {category}, "
+            f"description: {description}, "
+            f"payment_method: {payment_method},"
+            f"user_id: {user_id}\n"
+            for expense_date, amount, category, description, payment_method, user_id in expenses_data
+        ]
+        return f"Expense data ({len(lines)} entries):\n\n" + "".join(lines)
+
     except Exception as e:
-        logger.error(f"Error reading expenses: {str(e)}")
+        logger.error("Error reading expenses: %s", e)
         return "Error: Unable to retrieve expense data"
 
 
@@ -3,12 +3,54 @@ Action Agent - Agent C
 Responsible for deciding next steps and producing final results based on analysis.
 """
 
-import json
+import asyncio
+import itertools
+import re
+import textwrap
+import weakref
+from array import array
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from .base_agent import BaseAgent
+import orjson
+
+from ..utils.batch_utils import OpenAIBatchRunner
+from .base_agent import BaseAgent, parse_llm_json
+
+# Recommendation lines: a bullet item (group 1), or a plain line over 20 characters not ending in ':' (group 2)
+_BULLET_RE = re.compile(r"^\s*(?:[-•*][^\S\n]*(.*?)|(\S.{19,}[^:\s]))[^\S\n]*$", re.MULTILINE)
+
+# Sort score of each action priority, unknown priorities rank as medium
+_PRIORITY_SCORES = {
+    "critical": 4,
+    "high": 3,
+    "medium": 2,
+    "low": 1
+}
+
+# Urgency scores (1-10) too close to call on a routed cheaper model, re-asked on the agent's model
+_BORDERLINE_URGENCY_SCORES = (4, 6)
+
+
+def _prompt_json(value: Any) -> str:
+    """Serialize a value for a prompt without indentation whitespace, which only costs tokens."""
+    return orjson.dumps(value).decode("utf-8")
+
+
+def _score_byte(score: Any) -> int:
+    """Convert an execution score to the 0-255 range of the history score column; non-numeric scores count as 0."""
+    try:
+        return min(max(round(score), 0), 255)
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+
+def _is_borderline_urgency(assessment: Dict[str, Any]) -> bool:
+    """Return whether an urgency assessment scores in the borderline range."""
+    score = assessment.get("urgency_score")
+    low, high = _BORDERLINE_URGENCY_SCORES
+    return isinstance(score, (int, float)) and low <= score <= high
 
 
 class ActionPriority(Enum):
@@ -28,18 +70,9 @@ class ActionType(Enum):
 class ActionAgent(BaseAgent):
     """Agent responsible for decision-making and action planning based on analysis."""
     
-    def __init__(
-        self,
-        name: str = "Action Agent",
-        model: str = "gpt-4",
-        temperature: float = 0.4,  # Balanced for strategic thinking
-    ):
-        super().__init__(name, model, temperature)
-        self.action_history: List[Dict[str, Any]] = []
-        self.pending_actions: List[Dict[str, Any]] = []
-    
-    def get_system_prompt(self) -> str:
-        return """
+    # Built once and dedented: the indentation would only cost prompt tokens, and an identical
+    # system message on every call lets OpenAI's automatic prompt caching reuse the prefix
+    _SYSTEM_PROMPT = textwrap.dedent("""
         You are an Action Agent specialized in strategic decision-making and action planning.
         
         Your capabilities include:
@@ -62,7 +95,53 @@ class ActionAgent(BaseAgent):
         Always be strategic, practical, and results-oriented.
         Focus on actions that directly address the original objectives.
         Consider implementation feasibility and resource constraints.
+        """).strip()
+    
+    def __init__(
+        self,
+        name: str = "Action Agent",
+        model: str = "gpt-4",
+        temperature: float = 0.4,  # Balanced for strategic thinking
+        history_limit: int = 1000,
+        history_spill_path: Optional[str] = None,
+        model_router: Optional[Dict[str, str]] = None
+    ):
         """
+        Args:
+            name: Agent name
+            model: Default model of every pipeline stage
+            temperature: Sampling temperature
+            history_limit: Action history entries kept in memory, at least 1
+            history_spill_path: JSONL file receiving the entries evicted from the history
+            model_router: Pipeline stage -> model, e.g. {"urgency": "gpt-4o-mini"}; a routed urgency
+                answer that does not validate or scores borderline (4-6) is re-asked on the agent's model
+        
+        Raises:
+            ValueError: If history_limit is below 1
+        """
+        if history_limit < 1:
+            raise ValueError(f"history_limit must be at least 1, got {history_limit}")
+        
+        super().__init__(name, model, temperature)
+        # Pipeline stage -> model, e.g. {"urgency": "gpt-4o-mini"} to run the short structured JSON
+        # stage on a cheaper model; unlisted stages ("assessment", "action_plan", "urgency",
+        # "roadmap", "metrics", "risks", "resources", "final_recommendations") use the agent's model
+        self.model_router = model_router or {}
+        self.history_limit = history_limit  # entries kept in memory
+        self.history_spill_path = history_spill_path  # JSONL file receiving evicted entries, None drops them
+        # Action history is a ring buffer of history_limit entries, stored column-wise: the filter
+        # columns plus the serialized entries, which are only deserialized when the history is read
+        self._history_timestamps: List[str] = [""] * history_limit
+        self._history_scores = array("B", bytes(history_limit))  # execution scores (0-100)
+        self._history_payloads: List[Optional[bytes]] = [None] * history_limit
+        self._history_start = 0  # slot of the oldest entry
+        self._history_size = 0
+        self._history_spill = None
+        # Pending actions by id, in insertion order, so completing one is a dict pop
+        self._pending_by_id: Dict[Any, Dict[str, Any]] = {}
+    
+    def get_system_prompt(self) -> str:
+        return self._SYSTEM_PROMPT
     
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process analysis results and generate action plan."""
@@ -96,56 +175,57 @@ class ActionAgent(BaseAgent):
         }
         
         try:
-            # 1. Strategic assessment
-            action_results["strategic_assessment"] = await self._conduct_strategic_assessment(
-                analysis_data, research_data, original_query
-            )
-            
-            # 2. Generate comprehensive action plan
-            action_results["action_plan"] = await self._generate_action_plan(
-                analysis_data, objectives, constraints
-            )
-            
-            # 3. Prioritize actions
-            action_results["priority_actions"] = await self._prioritize_actions(
-                action_results["action_plan"]
-            )
-            
-            # 4. Create implementation roadmap
-            action_results["implementation_roadmap"] = await self._create_implementation_roadmap(
-                action_results["priority_actions"]
-            )
-            
-            # 5. Define success metrics
-            action_results["success_metrics"] = await self._define_success_metrics(
-                original_query, objectives, action_results["action_plan"]
+            # 1-2. Strategic assessment and action plan are independent, run them concurrently
+            (assessment, assessment_json), action_plan = await self._gather_steps(
+                self._conduct_strategic_assessment(analysis_data, research_data, original_query),
+                self._generate_action_plan(analysis_data, objectives, constraints),
             )
-            
-            # 6. Assess risks
-            action_results["risk_assessment"] = await self._assess_risks(
-                action_results["action_plan"], constraints
-            )
-            
-            # 7. Determine resource requirements
-            action_results["resource_requirements"] = await self._determine_resource_requirements(
-                action_results["action_plan"]
+            action_results["strategic_assessment"] = assessment
+            action_results["action_plan"] = action_plan
+            
+            # The execution readiness score (0-100) is accumulated as each stage completes:
+            # action plan quality (0-30) and strategic assessment completeness (0-20)
+            execution_score = min(30, len(action_plan) * 5)
+            if assessment:
+                execution_score += 20
+            
+            # 3-7. Every remaining step only needs the action plan; the roadmap chains on prioritization
+            (
+                (priority_actions, action_results["implementation_roadmap"]),
+                metrics,
+                (risks, risks_json),
+                resources,
+            ) = await self._gather_steps(
+                self._prioritize_and_plan_roadmap(action_plan),
+                self._define_success_metrics(original_query, objectives, action_plan),
+                self._assess_risks(action_plan, constraints),
+                self._determine_resource_requirements(action_plan),
             )
+            action_results["priority_actions"] = priority_actions
+            action_results["success_metrics"] = metrics
+            action_results["risk_assessment"] = risks
+            action_results["resource_requirements"] = resources
+            
+            # Risk assessment (0-20), success metrics defined (0-15) and resource requirements (0-15)
+            if risks:
+                execution_score += 20
+            execution_score += min(15, len(metrics) * 3)
+            if resources:
+                execution_score += 15
             
             # 8. Generate final recommendations
             action_results["final_recommendations"] = await self._generate_final_recommendations(
-                action_results
+                assessment_json, priority_actions, risks_json
             )
             
             # 9. Define immediate next steps
-            action_results["next_steps"] = self._define_next_steps(
-                action_results["priority_actions"]
-            )
+            action_results["next_steps"] = self._define_next_steps(priority_actions)
             
-            # 10. Calculate execution score
-            action_results["execution_score"] = self._calculate_execution_score(action_results)
+            # 10. Record execution score
+            action_results["execution_score"] = min(100, execution_score)
             
             # Store in action history
-            self.action_history.append(action_results)
+            self._record_history(action_results)
             
         except Exception as e:
             action_results["status"] = "failed"
@@ -153,6 +233,40 @@ class ActionAgent(BaseAgent):
         
         return action_results
     
+    async def process_batch(
+        self,
+        inputs: List[Dict[str, Any]],
+        poll_interval: float = 30.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Process many inputs through the OpenAI Batch API, e.g. to re-process the action history.
+        
+        Every pipeline stage is submitted as one batch job across all inputs, which is cheaper
+        than per-request calls but can take up to 24h; use process() for interactive requests.
+        
+        Args:
+            inputs: Input data dicts, as accepted by process()
+            poll_interval: Seconds between batch job status checks
+        
+        Returns:
+            List[Dict[str, Any]]: The action results, in the order of the inputs
+        """
+        batch_runner = OpenAIBatchRunner(poll_interval=poll_interval)
+        return await batch_runner.run([self.process(input_data) for input_data in inputs])
+    
+    async def _gather_steps(self, *steps):
+        """Run independent steps concurrently, letting every step finish before raising the first failure."""
+        results = await asyncio.gather(*steps, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
+    
+    async def _prioritize_and_plan_roadmap(self, action_plan: List[Dict[str, Any]]):
+        """Prioritize actions, then create the implementation roadmap from the priority actions."""
+        priority_actions = await self._prioritize_actions(action_plan)
+        return priority_actions, await self._create_implementation_roadmap(priority_actions)
+    
     def _summarize_inputs(
         self,
         analysis_data: Dict[str, Any],
@@ -173,11 +287,11 @@ class ActionAgent(BaseAgent):
         analysis_data: Dict[str, Any],
         research_data: Dict[str, Any],
         original_query: str
-    ) -> Dict[str, Any]:
-        """Conduct strategic assessment of the situation."""
+    ) -> Tuple[Dict[str, Any], str]:
+        """Conduct strategic assessment of the situation, returned parsed and as JSON."""
         analysis_summary = analysis_data.get("synthesis", "")
-        key_insights = json.dumps(analysis_data.get("key_insights", []), indent=2)
-        recommendations = json.dumps(analysis_data.get("recommendations", []), indent=2)
+        key_insights = _prompt_json(analysis_data.get("key_insights", []))
+        recommendations = _prompt_json(analysis_data.get("recommendations", []))
         
         messages = [{
             "role": "user",
@@ -204,12 +318,14 @@ class ActionAgent(BaseAgent):
             """
         }]
         
-        response = await self.invoke_llm(messages)
+        response = await self.invoke_llm(messages, model=self.model_router.get("assessment"))
         
+        # The JSON response is returned as-is too, so the final recommendations need not re-serialize it
         try:
-            return json.loads(response)
-        except json.JSONDecodeError:
-            return {"assessment": response, "format": "text"}
+            return orjson.loads(response), response
+        except orjson.JSONDecodeError:
+            assessment = {"assessment": response, "format": "text"}
+            return assessment, _prompt_json(assessment)
     
     async def _generate_action_plan(
         self,
@@ -218,11 +334,11 @@ class ActionAgent(BaseAgent):
         constraints: Dict[str, Any]
     ) -> List[Dict[str, Any]]:
         """Generate comprehensive action plan."""
-        insights = json.dumps(analysis_data.get("key_insights", []), indent=2)
-        recommendations = json.dumps(analysis_data.get("recommendations", []), indent=2)
+        insights = _prompt_json(analysis_data.get("key_insights", []))
+        recommendations = _prompt_json(analysis_data.get("recommendations", []))
         
         objectives_text = "\n".join([f"- {obj}" for obj in objectives]) if objectives else "Not specified"
-        constraints_text = json.dumps(constraints, indent=2) if constraints else "None specified"
+        constraints_text = _prompt_json(constraints) if constraints else "None specified"
         
         messages = [{
             "role": "user",
@@ -257,12 +373,10 @@ class ActionAgent(BaseAgent):
             """
         }]
         
-        response = await self.invoke_llm(messages)
+        response = await self.invoke_llm(messages, model=self.model_router.get("action_plan"))
         
-        try:
-            actions = json.loads(response)
-            return actions if isinstance(actions, list) else [actions]
-        except json.JSONDecodeError:
+        actions = parse_llm_json(response)
+        if actions is None:
             # Fallback parsing
             return [{
                 "title": "Primary Action",
@@ -270,42 +384,105 @@ class ActionAgent(BaseAgent):
                 "type": "implementation",
                 "priority": "high"
             }]
+        return actions if isinstance(actions, list) else [actions]
     
     async def _prioritize_actions(self, action_plan: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Prioritize actions based on impact, urgency, and dependencies."""
         if not action_plan:
             return []
         
-        # Sort by priority and add priority scores
-        priority_scores = {
-            "critical": 4,
-            "high": 3,
-            "medium": 2,
-            "low": 1
-        }
+        # One LLM call assesses the urgency of every action
+        urgency_assessments = await self._assess_actions_urgency_batch(action_plan)
         
-        prioritized_actions = []
-        for action in action_plan:
-            action_copy = action.copy()
-            priority = action.get("priority", "medium").lower()
-            action_copy["priority_score"] = priority_scores.get(priority, 2)
-            
-            # Add urgency assessment
-            action_copy["urgency_assessment"] = await self._assess_action_urgency(action)
-            
-            prioritized_actions.append(action_copy)
+        scored_actions = [
+            (_PRIORITY_SCORES.get(action.get("priority", "medium").lower(), 2), urgency_assessment, action)
+            for action, urgency_assessment in zip(action_plan, urgency_assessments)
+        ]
         
         # Sort by priority score (descending) then by urgency
-        prioritized_actions.sort(
-            key=lambda x: (x["priority_score"], x.get("urgency_assessment", {}).get("urgency_score", 0)),
+        scored_actions.sort(
+            key=lambda scored: (scored[0], scored[1].get("urgency_score", 0)),
             reverse=True
         )
         
-        return prioritized_actions[:5]  # Return top 5 priority actions
+        # Return top 5 priority actions; only these get new dicts, as the action plan
+        # itself is shared with the planning steps running concurrently
+        return [
+            {**action, "priority_score": priority_score, "urgency_assessment": urgency_assessment}
+            for priority_score, urgency_assessment, action in scored_actions[:5]
+        ]
+    
+    async def _assess_actions_urgency_batch(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Assess the urgency of all actions in a single LLM call."""
+        routed_model = self.model_router.get("urgency", self.model)
+        assessments = await self._request_urgency_batch(actions, routed_model)
+        if assessments is None and routed_model != self.model:
+            # A routed model whose answer does not validate is escalated to the agent's model
+            routed_model = self.model
+            assessments = await self._request_urgency_batch(actions, routed_model)
+        
+        if assessments is None:
+            # Fall back to one concurrent call per action when the batch answer does not line up
+            return await asyncio.gather(*(self._assess_action_urgency(action) for action in actions))
+        
+        if routed_model != self.model:
+            # Borderline scores of the routed model are re-asked on the agent's model in one more call
+            borderline = [index for index, assessment in enumerate(assessments) if _is_borderline_urgency(assessment)]
+            if borderline:
+                escalated = await self._request_urgency_batch([actions[index] for index in borderline], self.model)
+                for index, assessment in zip(borderline, escalated or ()):
+                    assessments[index] = assessment
+        
+        return assessments
+    
+    async def _request_urgency_batch(
+        self,
+        actions: List[Dict[str, Any]],
+        model: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Request the urgency of all actions on the given model; None unless the answer has one dict per action."""
+        actions_text = _prompt_json(actions)
+        
+        messages = [{
+            "role": "user",
+            "content": f"""
+            Assess the urgency of each of these actions:
+            
+            {actions_text}
+            
+            For each action consider:
+            1. Time sensitivity
+            2. Dependencies on other actions
+            3. External deadlines or constraints
+            4. Risk of delay
+            5. Impact on overall success
+            
+            Return a JSON array with exactly one element per action, in the same order,
+            where each element contains:
+            - urgency_level (immediate/soon/moderate/flexible)
+            - urgency_score (1-10)
+            - factors (key urgency factors)
+            """
+        }]
+        
+        response = await self.invoke_llm(messages, model=model)
+        
+        try:
+            assessments = orjson.loads(response)
+        except orjson.JSONDecodeError:
+            return None
+        
+        if (
+            isinstance(assessments, list)
+            and len(assessments) == len(actions)
+            and all(isinstance(assessment, dict) for assessment in assessments)
+        ):
+            return assessments
+        return None
     
     async def _assess_action_urgency(self, action: Dict[str, Any]) -> Dict[str, Any]:
         """Assess urgency of an individual action."""
-        action_text = json.dumps(action, indent=2)
+        action_text = _prompt_json(action)
         
         messages = [{
             "role": "user",
@@ -330,11 +507,11 @@ class ActionAgent(BaseAgent):
             """
         }]
         
-        response = await self.invoke_llm(messages)
+        response = await self.invoke_llm(messages, model=self.model_router.get("urgency"))
         
         try:
-            return json.loads(response)
-        except json.JSONDecodeError:
+            return orjson.loads(response)
+        except orjson.JSONDecodeError:
             return {
                 "urgency_level": "moderate",
                 "urgency_score": 5,
@@ -349,7 +526,7 @@ class ActionAgent(BaseAgent):
         if not priority_actions:
             return {"phases": [], "timeline": "Not determined"}
         
-        actions_text = json.dumps(priority_actions, indent=2)
+        actions_text = _prompt_json(priority_actions)
         
         messages = [{
             "role": "user",
@@ -376,11 +553,11 @@ class ActionAgent(BaseAgent):
             """
         }]
         
-        response = await self.invoke_llm(messages)
+        response = await self.invoke_llm(messages, model=self.model_router.get("roadmap"))
         
         try:
-            return json.loads(response)
-        except json.JSONDecodeError:
+            return orjson.loads(response)
+        except orjson.JSONDecodeError:
             return {
                 "phases": ["Phase 1: Planning", "Phase 2: Implementation", "Phase 3: Review"],
                 "timeline": response,
@@ -426,12 +603,12 @@ class ActionAgent(BaseAgent):
             """
         }]
         
-        response = await self.invoke_llm(messages)
+        response = await self.invoke_llm(messages, model=self.model_router.get("metrics"))
         
         try:
-            metrics = json.loads(response)
+            metrics = orjson.loads(response)
             return metrics if isinstance(metrics, list) else [metrics]
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             return [{
                 "name": "Overall Success",
                 "description": response,
@@ -442,10 +619,10 @@ class ActionAgent(BaseAgent):
         self,
         action_plan: List[Dict[str, Any]],
         constraints: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Assess risks and develop mitigation strategies."""
-        actions_text = json.dumps(action_plan, indent=2)
-        constraints_text = json.dumps(constraints, indent=2)
+    ) -> Tuple[Dict[str, Any], str]:
+        """Assess risks and develop mitigation strategies, returned parsed and as JSON."""
+        actions_text = _prompt_json(action_plan)
+        constraints_text = _prompt_json(constraints)
         
         messages = [{
             "role": "user",
@@ -474,19 +651,21 @@ class ActionAgent(BaseAgent):
             """
         }]
         
-        response = await self.invoke_llm(messages)
+        response = await self.invoke_llm(messages, model=self.model_router.get("risks"))
         
+        # The JSON response is returned as-is too, so the final recommendations need not re-serialize it
         try:
-            return json.loads(response)
-        except json.JSONDecodeError:
-            return {"risk_assessment": response, "format": "text"}
+            return orjson.loads(response), response
+        except orjson.JSONDecodeError:
+            risk_assessment = {"risk_assessment": response, "format": "text"}
+            return risk_assessment, _prompt_json(risk_assessment)
     
     async def _determine_resource_requirements(
         self,
         action_plan: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
         """Determine resource requirements for implementation."""
-        actions_text = json.dumps(action_plan, indent=2)
+        actions_text = _prompt_json(action_plan)
         
         messages = [{
             "role": "user",
@@ -507,32 +686,33 @@ class ActionAgent(BaseAgent):
             """
         }]
         
-        response = await self.invoke_llm(messages)
+        response = await self.invoke_llm(messages, model=self.model_router.get("resources"))
         
         try:
-            return json.loads(response)
-        except json.JSONDecodeError:
+            return orjson.loads(response)
+        except orjson.JSONDecodeError:
             return {"resources": response, "format": "text"}
     
-    async def _generate_final_recommendations(self, action_results: Dict[str, Any]) -> List[str]:
-        """Generate final strategic recommendations."""
-        # Summarize key components
-        strategic_assessment = action_results.get("strategic_assessment", {})
-        priority_actions = action_results.get("priority_actions", [])
-        risk_assessment = action_results.get("risk_assessment", {})
-        
-        context = {
-            "strategic_assessment": strategic_assessment,
-            "top_actions": priority_actions[:3],  # Top 3 actions
-            "key_risks": risk_assessment
-        }
+    async def _generate_final_recommendations(
+        self,
+        strategic_assessment_json: str,
+        priority_actions: List[Dict[str, Any]],
+        risk_assessment_json: str
+    ) -> List[str]:
+        """Generate final strategic recommendations from the JSON the earlier steps already produced."""
+        # Summarize key components; only the top 3 actions still need serializing
+        context = (
+            f'{{"strategic_assessment":{strategic_assessment_json},'
+            f'"top_actions":{_prompt_json(priority_actions[:3])},'
+            f'"key_risks":{risk_assessment_json}}}'
+        )
         
         messages = [{
             "role": "user",
             "content": f"""
             Generate final strategic recommendations based on this analysis:
             
-            {json.dumps(context, indent=2)}
+            {context}
             
             Provide 3-5 final recommendations that:
             1. Synthesize all analysis and planning
@@ -546,18 +726,11 @@ class ActionAgent(BaseAgent):
             """
         }]
         
-        response = await self.invoke_llm(messages)
-        
-        # Parse recommendations from response
-        recommendations = []
-        for line in response.split('\n'):
-            line = line.strip()
-            if line and (line.startswith('-') or line.startswith('•') or line.startswith('*')):
-                recommendations.append(line[1:].strip())
-            elif line and len(line) > 20 and not line.endswith(':'):
-                recommendations.append(line)
+        response = await self.invoke_llm(messages, model=self.model_router.get("final_recommendations"))
         
-        return recommendations[:5]  # Limit to 5 key recommendations
+        # Parse recommendations from response, stopping at the 5 key recommendations
+        matches = itertools.islice(_BULLET_RE.finditer(response), 5)
+        return [match.group(match.lastindex) for match in matches]
     
     def _define_next_steps(self, priority_actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Define immediate next steps from priority actions."""
@@ -576,32 +749,6 @@ class ActionAgent(BaseAgent):
         
         return next_steps
     
-    def _calculate_execution_score(self, action_results: Dict[str, Any]) -> int:
-        """Calculate execution readiness score (0-100)."""
-        score = 0
-        
-        # Action plan quality (0-30)
-        action_count = len(action_results.get("action_plan", []))
-        score += min(30, action_count * 5)
-        
-        # Strategic assessment completeness (0-20)
-        if action_results.get("strategic_assessment"):
-            score += 20
-        
-        # Risk assessment (0-20)
-        if action_results.get("risk_assessment"):
-            score += 20
-        
-        # Success metrics defined (0-15)
-        metrics_count = len(action_results.get("success_metrics", []))
-        score += min(15, metrics_count * 3)
-        
-        # Resource requirements (0-15)
-        if action_results.get("resource_requirements"):
-            score += 15
-        
-        return min(100, score)
-    
     def get_capabilities(self) -> List[str]:
         """Return list of action agent capabilities."""
         base_capabilities = super().get_capabilities()
@@ -616,25 +763,99 @@ class ActionAgent(BaseAgent):
         ]
         return base_capabilities + action_capabilities
     
-    def get_action_history(self) -> List[Dict[str, Any]]:
-        """Return action history."""
-        return self.action_history
+    def _record_history(self, entry: Dict[str, Any]):
+        """Append an entry to the action history, evicting the oldest one when it is full."""
+        slot = (self._history_start + self._history_size) % self.history_limit
+        if self._history_size == self.history_limit:
+            self._spill_history(self._history_payloads[slot])
+            self._history_start = (self._history_start + 1) % self.history_limit
+        else:
+            self._history_size += 1
+        
+        self._history_timestamps[slot] = entry.get("completed_timestamp") or entry.get("timestamp", "")
+        self._history_scores[slot] = _score_byte(entry.get("execution_score", 0))
+        self._history_payloads[slot] = orjson.dumps(entry, default=str)
+    
+    def _spill_history(self, payload: bytes):
+        """Append an evicted history entry to the spill file, through a write buffer."""
+        if self.history_spill_path is None:
+            return
+        if self._history_spill is None:
+            self._history_spill = open(self.history_spill_path, "ab", buffering=1 << 16)
+            weakref.finalize(self, self._history_spill.close)
+        self._history_spill.write(payload + b"\n")
+    
+    def get_action_history(
+        self,
+        since: Optional[str] = None,
+        min_score: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the in-memory action history, oldest first.
+        
+        Args:
+            since: Only return entries recorded at or after this ISO timestamp
+            min_score: Only return entries with at least this execution score
+        
+        Returns:
+            List[Dict[str, Any]]: The matching entries; only these are deserialized
+        """
+        slots = ((self._history_start + i) % self.history_limit for i in range(self._history_size))
+        indices = [
+            i for i in slots
+            if (since is None or self._history_timestamps[i] >= since)
+            and (min_score is None or self._history_scores[i] >= min_score)
+        ]
+        return [orjson.loads(self._history_payloads[i]) for i in indices]
+    
+    def get_execution_scores(self) -> array:
+        """
+        Return the execution scores of the in-memory action history, oldest first.
+        
+        Returns:
+            array: Unsigned byte array, readable as a NumPy array without copying
+                (np.frombuffer(scores, dtype=np.uint8)) for batch evaluations
+        """
+        start, end = self._history_start, self._history_start + self._history_size
+        if end <= self.history_limit:
+            return self._history_scores[start:end]
+        return self._history_scores[start:] + self._history_scores[:end - self.history_limit]
     
     def get_pending_actions(self) -> List[Dict[str, Any]]:
         """Return pending actions."""
-        return self.pending_actions
+        return list(self._pending_by_id.values())
     
-    def add_pending_action(self, action: Dict[str, Any]):
-        """Add action to pending list."""
-        action["added_timestamp"] = datetime.now().isoformat()
-        self.pending_actions.append(action)
+    def add_pending_action(self, action: Dict[str, Any], now: Optional[datetime] = None):
+        """
+        Add action to pending list; actions without an id cannot be completed.
+        
+        Args:
+            action: The action to add
+            now: Time the action was added, so callers adding many actions read the clock once
+            
+        Raises:
+            ValueError: If an action with the same id is already pending
+        """
+        action_id = action.get("id", object())
+        if action_id in self._pending_by_id:
+            raise ValueError(f"Action {action_id!r} is already pending")
+        action["added_timestamp"] = (now or datetime.now()).isoformat()
+        self._pending_by_id[action_id] = action
     
-    def complete_pending_action(self, action_id: str) -> bool:
-        """Mark pending action as completed."""
-        for i, action in enumerate(self.pending_actions):
-            if action.get("id") == action_id:
-                completed_action = self.pending_actions.pop(i)
-                completed_action["completed_timestamp"] = datetime.now().isoformat()
-                self.action_history.append(completed_action)
-                return True
-        return False
\ No newline at end of file
+    def complete_pending_action(self, action_id: str, now: Optional[datetime] = None) -> bool:
+        """
+        Mark pending action as completed.
+        
+        Args:
+            action_id: Id of the pending action
+            now: Completion time, defaults to the current time
+        
+        Returns:
+            bool: Whether a pending action with this id existed
+        """
+        completed_action = self._pending_by_id.pop(action_id, None)
+        if completed_action is None:
+            return False
+        completed_action["completed_timestamp"] = (now or datetime.now()).isoformat()
+        self._record_history(completed_action)
+        return True
\ No newline at end of file
@@ -3,11 +3,59 @@ Analysis Agent - Agent B
 Responsible for analyzing and summarizing information gathered by the Research Agent.
 """
 
+import asyncio
+import hashlib
+import itertools
 import json
+import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from .base_agent import BaseAgent
+import orjson
+
+from .base_agent import BaseAgent, parse_llm_json
+
+_SYNTHESIS_INSTRUCTIONS = {
+    "comprehensive": "Provide a thorough, detailed synthesis covering all aspects",
+    "executive": "Focus on high-level findings and strategic implications",
+    "technical": "Emphasize technical details, methodologies, and data analysis",
+    "comparative": "Compare and contrast different sources and viewpoints",
+    "critical": "Critically evaluate claims, identify weaknesses and strengths"
+}
+
+
+# Numbered or bulleted list items, captured without the marker
+_LIST_ITEM_RE = re.compile(r"^[^\S\n]*(?:\d+\.|[-•*])[^\S\n]*(\S.*?)[^\S\n]*$", re.MULTILINE)
+# Section headers: the first line mentioning the section name and containing a colon
+_INSIGHTS_HEADER_RE = re.compile(r"^(?=.*insight)(?=.*:).*$", re.IGNORECASE | re.MULTILINE)
+_RECOMMENDATIONS_HEADER_RE = re.compile(r"^(?=.*recommendation)(?=.*:).*$", re.IGNORECASE | re.MULTILINE)
+# The insights section ends at a line (optionally a Markdown heading or bold) starting a following section
+_INSIGHTS_END_RE = re.compile(
+    r"^[^\S\n]*(?:#+[^\S\n]*|\*\*)?(?:recommendation|consider|important)", re.IGNORECASE | re.MULTILINE
+)
+
+
+def _parse_section_items(
+    text: str,
+    header_re: re.Pattern,
+    end_re: Optional[re.Pattern] = None,
+    limit: int = 5
+) -> List[str]:
+    """Extract up to `limit` list items from the section of a text starting after the header line."""
+    header = header_re.search(text)
+    if header is None:
+        return []
+    
+    section_end = end_re.search(text, header.end()) if end_re is not None else None
+    end = section_end.start() if section_end else len(text)
+    return [item.group(1) for item in itertools.islice(_LIST_ITEM_RE.finditer(text, header.end(), end), limit)]
+
+
+def _as_list(value: Any) -> List[Any]:
+    """Wrap a single parsed JSON value in a list."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
 
 
 class AnalysisAgent(BaseAgent):
@@ -18,9 +66,13 @@ class AnalysisAgent(BaseAgent):
         name: str = "Analysis Agent",
         model: str = "gpt-4",
         temperature: float = 0.5,  # Balanced temperature for analysis
+        use_fused: bool = True
     ):
         super().__init__(name, model, temperature)
         self.analysis_cache: Dict[str, Any] = {}
+        # Run the LLM analysis steps as one request sharing a single copy of the content,
+        # instead of one request per step
+        self.use_fused = use_fused
     
     def get_system_prompt(self) -> str:
         return """
@@ -77,6 +129,12 @@ class AnalysisAgent(BaseAgent):
             print("🔄 No scraped content available, generating analysis based on query knowledge")
             return await self._analyze_from_query(research_data.get('query'), analysis_type)
         
+        # Return a previous analysis of the same data before doing any LLM work
+        cache_key = self._get_cache_key(research_data, analysis_type, focus_areas)
+        cached_results = self.analysis_cache.get(cache_key)
+        if cached_results is not None:
+            return cached_results
+        
         analysis_results = {
             "analysis_type": analysis_type,
             "input_summary": self._summarize_input_data(research_data),
@@ -91,41 +149,151 @@ class AnalysisAgent(BaseAgent):
             "timestamp": datetime.now().isoformat()
         }
         
-        try:
-            # 1. Evaluate sources
-            analysis_results["source_evaluation"] = await self._evaluate_sources(research_data)
-            
-            # 2. Extract key insights
-            analysis_results["key_insights"] = await self._extract_key_insights(
-                research_data, focus_areas
-            )
-            
-            # 3. Identify patterns
-            analysis_results["patterns_identified"] = await self._identify_patterns(research_data)
+        # The content text is built once and shared by every step that prompts with it
+        content_text = self._extract_content_text(research_data)
+        
+        if self.use_fused:
+            try:
+                fused_results = await self._run_full_analysis(
+                    research_data, content_text, analysis_type, focus_areas
+                )
+            except Exception as e:
+                analysis_results["status"] = "failed"
+                analysis_results["error"] = str(e)
+                return analysis_results
+            if fused_results is not None:
+                analysis_results.update(fused_results)
+                self.analysis_cache[cache_key] = analysis_results
+                return analysis_results
+            print("⚠️ Combined analysis response was not valid JSON, running the analysis steps separately")
+        
+        # Only the recommendations depend on another step (the key insights), so the steps
+        # run concurrently, with the recommendations chained after the insights
+        steps = {
+            "source_evaluation": self._evaluate_sources(research_data),
+            ("key_insights", "recommendations"): self._extract_insights_and_recommendations(
+                research_data, content_text, focus_areas
+            ),
+            "patterns_identified": self._identify_patterns(content_text),
+            "synthesis": self._synthesize_information(research_data, content_text, analysis_type),
+            "confidence_scores": self._assess_confidence(research_data),
+            "limitations": self._identify_limitations(research_data, content_text),
+        }
+        results = await asyncio.gather(*steps.values(), return_exceptions=True)
+        
+        # Keep the results of the steps that succeeded when another one fails
+        errors = []
+        for keys, result in zip(steps, results):
+            if isinstance(result, BaseException):
+                errors.append(result)
+            elif isinstance(keys, tuple):
+                analysis_results.update(zip(keys, result))
+            else:
+                analysis_results[keys] = result
+        
+        if errors:
+            analysis_results["status"] = "failed"
+            analysis_results["error"] = str(errors[0])
+        else:
+            # Cache results
+            self.analysis_cache[cache_key] = analysis_results
+        
+        return analysis_results
+    
+    def _get_cache_key(
+        self,
+        research_data: Dict[str, Any],
+        analysis_type: str,
+        focus_areas: List[str]
+    ) -> str:
+        """Generate a stable cache key from the content of the analysis input."""
+        # Hash the canonical JSON bytes; unlike hash(str(...)), the digest is the same in every process
+        cache_hash = hashlib.blake2b(digest_size=16)
+        cache_hash.update(orjson.dumps(focus_areas, default=str))
+        cache_hash.update(b"\x00")
+        cache_hash.update(
+            orjson.dumps(research_data, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        )
+        return f"{analysis_type}_{cache_hash.hexdigest()}"
+    
+    async def _run_full_analysis(
+        self,
+        research_data: Dict[str, Any],
+        content_text: str,
+        analysis_type: str,
+        focus_areas: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Run every LLM analysis step in one request.
+        
+        Args:
+            research_data: Research data to analyze
+            content_text: Content text of the research data
+            analysis_type: Type of synthesis to write
+            focus_areas: Areas the key insights should focus on
             
-            # 4. Synthesize information
-            analysis_results["synthesis"] = await self._synthesize_information(
-                research_data, analysis_type
-            )
+        Returns:
+            The analysis results by analysis_results key, or None if the response is not a JSON object
+        """
+        sources = research_data.get("sources_researched", [])
+        instruction = _SYNTHESIS_INSTRUCTIONS.get(analysis_type, _SYNTHESIS_INSTRUCTIONS["comprehensive"])
+        
+        focus_instruction = ""
+        if focus_areas:
+            focus_instruction = f"\nFocus the key insights particularly on these areas: {', '.join(focus_areas)}"
+        
+        messages = [{
+            "role": "user",
+            "content": f"""
+            Analyze the following research content:
             
-            # 5. Generate recommendations
-            analysis_results["recommendations"] = await self._generate_recommendations(
-                research_data, analysis_results["key_insights"]
-            )
+            Research Query: {research_data.get('query', '')}
             
-            # 6. Assess confidence and limitations
-            analysis_results["confidence_scores"] = await self._assess_confidence(research_data)
-            analysis_results["limitations"] = await self._identify_limitations(research_data)
+            Sources: {json.dumps(sources, indent=2)}
             
-            # Cache results
-            cache_key = f"{analysis_type}_{hash(str(research_data))}"
-            self.analysis_cache[cache_key] = analysis_results
+            Content:
+            {content_text}
+            {focus_instruction}
             
-        except Exception as e:
-            analysis_results["status"] = "failed"
-            analysis_results["error"] = str(e)
+            Return a single JSON object with these keys:
+            - "source_evaluation": object evaluating each source's credibility (High/Medium/Low),
+              potential bias indicators, source type, reliability factors and red flags
+            - "key_insights": array of 5-7 objects (insight statement, supporting evidence,
+              confidence level High/Medium/Low, relevance score 1-10)
+            - "patterns": array of objects (pattern description, evidence, strength
+              Strong/Moderate/Weak, implications) covering recurring themes, trends,
+              correlations, contradictions, data gaps and cause-and-effect relationships
+            - "synthesis": string, a well-structured synthesis with clear headings that
+              addresses the query and distinguishes facts from interpretations.
+              Analysis type: {analysis_type}. Instructions: {instruction}
+            - "recommendations": array of 3-5 objects based on the key insights
+              (recommendation statement, rationale, expected impact High/Medium/Low,
+              implementation difficulty Easy/Medium/Hard, risk level Low/Medium/High, timeline)
+            - "limitations": array of 2-3 concise strings on data quality, scope, bias,
+              temporal or methodology limitations
+            
+            Respond with the JSON object only.
+            """
+        }]
         
-        return analysis_results
+        response = await self.invoke_llm(messages)
+        
+        fused = parse_llm_json(response)
+        if not isinstance(fused, dict):
+            return None
+        
+        limitations = self._data_limitations(research_data)
+        limitations.extend(str(limitation) for limitation in _as_list(fused.get("limitations")))
+        
+        return {
+            "source_evaluation": fused.get("source_evaluation") or {"evaluation": "No sources to evaluate"},
+            "key_insights": _as_list(fused.get("key_insights")),
+            "patterns_identified": _as_list(fused.get("patterns")),
+            "synthesis": fused.get("synthesis", ""),
+            "recommendations": _as_list(fused.get("recommendations")),
+            "confidence_scores": await self._assess_confidence(research_data),
+            "limitations": limitations[:5]
+        }
     
     def _summarize_input_data(self, research_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a summary of input data for tracking."""
@@ -171,20 +339,27 @@ class AnalysisAgent(BaseAgent):
         
         response = await self.invoke_llm(messages)
         
-        try:
-            # Try to parse as JSON, fallback to text analysis
-            return json.loads(response)
-        except json.JSONDecodeError:
-            return {"evaluation": response, "format": "text"}
+        # Try to parse as JSON, fallback to text analysis
+        return parse_llm_json(response, {"evaluation": response, "format": "text"})
+    
+    async def _extract_insights_and_recommendations(
+        self,
+        research_data: Dict[str, Any],
+        content_text: str,
+        focus_areas: List[str]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Extract key insights, then generate recommendations from them."""
+        key_insights = await self._extract_key_insights(research_data, content_text, focus_areas)
+        recommendations = await self._generate_recommendations(research_data, key_insights)
+        return key_insights, recommendations
     
     async def _extract_key_insights(
         self,
         research_data: Dict[str, Any],
+        content_text: str,
         focus_areas: List[str]
     ) -> List[Dict[str, Any]]:
         """Extract key insights from research data."""
-        content_text = self._extract_content_text(research_data)
-        
         focus_instruction = ""
         if focus_areas:
             focus_instruction = f"\nFocus particularly on these areas: {', '.join(focus_areas)}"
@@ -219,17 +394,12 @@ class AnalysisAgent(BaseAgent):
         
         response = await self.invoke_llm(messages)
         
-        try:
-            insights = json.loads(response)
-            return insights if isinstance(insights, list) else [insights]
-        except json.JSONDecodeError:
-            # Fallback to parsing text response
-            return [{"insight": response, "confidence": "medium", "relevance": 7}]
+        # Fallback to the text response as a single insight
+        insights = parse_llm_json(response, [{"insight": response, "confidence": "medium", "relevance": 7}])
+        return insights if isinstance(insights, list) else [insights]
     
-    async def _identify_patterns(self, research_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def _identify_patterns(self, content_text: str) -> List[Dict[str, Any]]:
         """Identify patterns and trends in the research data."""
-        content_text = self._extract_content_text(research_data)
-        
         messages = [{
             "role": "user",
             "content": f"""
@@ -257,30 +427,19 @@ class AnalysisAgent(BaseAgent):
         
         response = await self.invoke_llm(messages)
         
-        try:
-            patterns = json.loads(response)
-            return patterns if isinstance(patterns, list) else [patterns]
-        except json.JSONDecodeError:
-            return [{"pattern": response, "strength": "moderate"}]
+        patterns = parse_llm_json(response, [{"pattern": response, "strength": "moderate"}])
+        return patterns if isinstance(patterns, list) else [patterns]
     
     async def _synthesize_information(
         self,
         research_data: Dict[str, Any],
+        content_text: str,
         analysis_type: str
     ) -> str:
         """Synthesize all information into a coherent analysis."""
-        content_text = self._extract_content_text(research_data)
         summary = research_data.get("summary", "")
         
-        synthesis_instructions = {
-            "comprehensive": "Provide a thorough, detailed synthesis covering all aspects",
-            "executive": "Focus on high-level findings and strategic implications",
-            "technical": "Emphasize technical details, methodologies, and data analysis",
-            "comparative": "Compare and contrast different sources and viewpoints",
-            "critical": "Critically evaluate claims, identify weaknesses and strengths"
-        }
-        
-        instruction = synthesis_instructions.get(analysis_type, synthesis_instructions["comprehensive"])
+        instruction = _SYNTHESIS_INSTRUCTIONS.get(analysis_type, _SYNTHESIS_INSTRUCTIONS["comprehensive"])
         
         messages = [{
             "role": "user",
@@ -349,11 +508,10 @@ class AnalysisAgent(BaseAgent):
         
         response = await self.invoke_llm(messages)
         
-        try:
-            recommendations = json.loads(response)
-            return recommendations if isinstance(recommendations, list) else [recommendations]
-        except json.JSONDecodeError:
-            return [{"recommendation": response, "impact": "medium", "difficulty": "medium"}]
+        recommendations = parse_llm_json(
+            response, [{"recommendation": response, "impact": "medium", "difficulty": "medium"}]
+        )
+        return recommendations if isinstance(recommendations, list) else [recommendations]
     
     async def _assess_confidence(self, research_data: Dict[str, Any]) -> Dict[str, Any]:
         """Assess confidence levels in different aspects of the analysis."""
@@ -403,11 +561,10 @@ class AnalysisAgent(BaseAgent):
         else:
             return "low"
     
-    async def _identify_limitations(self, research_data: Dict[str, Any]) -> List[str]:
-        """Identify limitations in the research and analysis."""
+    def _data_limitations(self, research_data: Dict[str, Any]) -> List[str]:
+        """Check the research data for common limitations."""
         limitations = []
         
-        # Check for common limitations
         source_count = len(research_data.get("sources_researched", []))
         if source_count < 3:
             limitations.append(f"Limited number of sources ({source_count})")
@@ -419,8 +576,15 @@ class AnalysisAgent(BaseAgent):
         if not research_data.get("search_results"):
             limitations.append("No historical data search performed")
         
+        return limitations
+    
+    async def _identify_limitations(self, research_data: Dict[str, Any], content_text: str) -> List[str]:
+        """Identify limitations in the research and analysis."""
+        limitations = self._data_limitations(research_data)
+        source_count = len(research_data.get("sources_researched", []))
+        
         # Use LLM to identify additional limitations
-        content_text = self._extract_content_text(research_data)[:1000]  # Truncate for analysis
+        content_sample = content_text[:1000]  # Truncate for analysis
         
         messages = [{
             "role": "user",
@@ -428,7 +592,7 @@ class AnalysisAgent(BaseAgent):
             Identify potential limitations in this research analysis:
             
             Research Query: {research_data.get('query', '')}
-            Content Sample: {content_text}
+            Content Sample: {content_sample}
             Source Count: {source_count}
             
             Identify limitations such as:
@@ -500,43 +664,11 @@ class AnalysisAgent(BaseAgent):
     
     def _parse_insights_from_text(self, text: str) -> List[str]:
         """Extract insights from LLM response text."""
-        insights = []
-        lines = text.split('\n')
-        in_insights_section = False
-        
-        for line in lines:
-            line = line.strip()
-            if 'insight' in line.lower() and ':' in line:
-                in_insights_section = True
-                continue
-            elif in_insights_section and line:
-                if line.startswith(('1.', '2.', '3.', '4.', '5.', '-', '•', '*')):
-                    insight = line[2:].strip() if line[1:2] == '.' else line[1:].strip()
-                    if insight:
-                        insights.append(insight)
-                elif line.startswith(('recommendation', 'consider', 'important')):
-                    break
-        
-        return insights[:5]  # Limit to 5 insights
+        return _parse_section_items(text, _INSIGHTS_HEADER_RE, _INSIGHTS_END_RE)  # Limit to 5 insights
     
     def _parse_recommendations_from_text(self, text: str) -> List[str]:
         """Extract recommendations from LLM response text."""
-        recommendations = []
-        lines = text.split('\n')
-        in_recommendations_section = False
-        
-        for line in lines:
-            line = line.strip()
-            if 'recommendation' in line.lower() and ':' in line:
-                in_recommendations_section = True
-                continue
-            elif in_recommendations_section and line:
-                if line.startswith(('1.', '2.', '3.', '4.', '5.', '-', '•', '*')):
-                    rec = line[2:].strip() if line[1:2] == '.' else line[1:].strip()
-                    if rec:
-                        recommendations.append(rec)
-        
-        return recommendations[:5]  # Limit to 5 recommendations
+        return _parse_section_items(text, _RECOMMENDATIONS_HEADER_RE)  # Limit to 5 recommendations
     
     def _extract_content_text(self, research_data: Dict[str, Any]) -> str:
         """Extract text content from research data for analysis."""
@@ -549,11 +681,8 @@ class AnalysisAgent(BaseAgent):
         # Add content from gathered sources
         for item in research_data.get("content_gathered", []):
             if item.get("type") in ["scraped", "fetched"] and item.get("content"):
-                source_info = f"SOURCE ({item.get('url', 'unknown')}):\n"
-                if item.get("title"):
-                    source_info += f"Title: {item['title']}\n"
-                source_info += item["content"]
-                content_parts.append(source_info)
+                title = f"Title: {item['title']}\n" if item.get("title") else ""
+                content_parts.append(f"SOURCE ({item.get('url', 'unknown')}):\n{title}{item['content']}")
         
         return "\n\n---\n\n".join(content_parts)
     
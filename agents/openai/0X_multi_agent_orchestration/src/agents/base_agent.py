@@ -3,34 +3,78 @@ Base Agent class and common functionality for all agents.
 """
 
 import asyncio
+import hashlib
+import json
+import re
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 
+from ..utils.batch_utils import OpenAIBatchRunner, active_batch_runner, chat_completion_body
+
+# A response wrapped in a Markdown code block, e.g. ```json ... ```
+_CODE_BLOCK_RE = re.compile(r"^```[\w-]*\s*(.*?)\s*```$", re.DOTALL)
+
+
+def parse_llm_json(response: str, fallback: Any = None) -> Any:
+    """Parse a JSON LLM response, also when it is wrapped in a code block; return fallback if it is not JSON."""
+    try:
+        return orjson.loads(response)
+    except orjson.JSONDecodeError:
+        pass
+    
+    code_block = _CODE_BLOCK_RE.match(response.strip())
+    if code_block:
+        try:
+            return orjson.loads(code_block.group(1))
+        except orjson.JSONDecodeError:
+            pass
+    return fallback
+
 
 class BaseAgent(ABC):
     """Base class for all agents in the multi-agent system."""
     
+    # Exact-match LLM response cache shared by every agent instance (LRU, keys include the agent name)
+    _response_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+    response_cache_size = 1024
+    # LLM requests in flight by cache key and batch runner, so concurrent identical requests share
+    # one API call; interactive requests never wait on a batch job and vice versa
+    _inflight: Dict[Tuple[str, Optional[OpenAIBatchRunner]], "asyncio.Task[str]"] = {}
+    
     def __init__(
         self,
         name: str,
         model: str = "gpt-4",
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        max_concurrency: int = 4,
+        cache_ttl: float = 3600.0,
+        llm_timeout: Optional[float] = None
     ):
         self.name = name
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.max_concurrency = max_concurrency
+        self.cache_ttl = cache_ttl  # seconds, 0 disables the response cache
+        self.llm_timeout = llm_timeout  # seconds per LLM call, None waits indefinitely
+        # Bounds the LLM calls an agent has in flight when its steps run concurrently
+        self._llm_semaphore = asyncio.Semaphore(max_concurrency)
         self.llm = ChatOpenAI(
             model=model,
             temperature=temperature,
             max_tokens=max_tokens
         )
+        # Chat models by name, for calls routed to a model other than the agent's default
+        self._llms: Dict[str, ChatOpenAI] = {model: self.llm}
         self.conversation_history: List[Dict[str, Any]] = []
     
     @abstractmethod
@@ -58,14 +102,56 @@ class BaseAgent(ABC):
     async def invoke_llm(
         self,
         messages: List[Dict[str, str]],
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        model: Optional[str] = None
     ) -> str:
-        """Invoke the LLM with messages."""
+        """Invoke the LLM with messages, on the given model or the agent's default one."""
+        model = model or self.model
+        chat_messages = self._build_chat_messages(messages, system_prompt)
+        
+        # Invoke LLM, unless the same request was answered recently
+        cache_key = self._cache_key(chat_messages, model)
+        content = self._get_cached_response(cache_key)
+        if content is None:
+            inflight_key = (cache_key, active_batch_runner.get())
+            request = self._inflight.get(inflight_key)
+            if request is None:
+                request = asyncio.ensure_future(self._request_llm(chat_messages, model))
+                self._inflight[inflight_key] = request
+                request.add_done_callback(lambda _: self._inflight.pop(inflight_key, None))
+            # Shielded, so a cancelled caller does not cancel the request for the others
+            content = await asyncio.shield(request)
+            self._cache_response(cache_key, content)
+        
+        # Log conversation
+        self.add_to_history("user", messages[-1]["content"] if messages else "")
+        self.add_to_history("assistant", content)
+        
+        return content
+    
+    async def _request_llm(self, chat_messages: List[Any], model: str) -> str:
+        """Send a request to the LLM, or to the active batch run."""
+        batch_runner = active_batch_runner.get()
+        if batch_runner is not None:
+            # Part of a batch run: the request is sent with the other pipelines' requests
+            return await batch_runner.request(self._batch_request_body(chat_messages, model))
+        
+        async with self._llm_semaphore:
+            response = await asyncio.wait_for(self._get_llm(model).ainvoke(chat_messages), self.llm_timeout)
+        return response.content
+    
+    def _build_chat_messages(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: Optional[str] = None
+    ) -> List[Any]:
+        """Convert role/content dicts into chat messages, prefixed by the system prompt."""
         chat_messages = []
         
         # Add system prompt
-        if system_prompt or self.get_system_prompt():
-            chat_messages.append(SystemMessage(content=system_prompt or self.get_system_prompt()))
+        system_prompt = system_prompt or self.get_system_prompt()
+        if system_prompt:
+            chat_messages.append(SystemMessage(content=system_prompt))
         
         # Add conversation messages
         for msg in messages:
@@ -74,14 +160,52 @@ class BaseAgent(ABC):
             elif msg["role"] == "assistant":
                 chat_messages.append(AIMessage(content=msg["content"]))
         
-        # Invoke LLM
-        response = await self.llm.ainvoke(chat_messages)
-        
-        # Log conversation
-        self.add_to_history("user", messages[-1]["content"] if messages else "")
-        self.add_to_history("assistant", response.content)
-        
-        return response.content
+        return chat_messages
+    
+    def _get_llm(self, model: str) -> ChatOpenAI:
+        """Return the chat model for a model name, created with the agent's settings on first use."""
+        llm = self._llms.get(model)
+        if llm is None:
+            llm = self._llms[model] = ChatOpenAI(
+                model=model,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens
+            )
+        return llm
+    
+    def _batch_request_body(self, chat_messages: List[Any], model: str) -> Dict[str, Any]:
+        """Build the Batch API request body with this agent's model settings."""
+        return chat_completion_body(model, self.temperature, self.max_tokens, chat_messages)
+    
+    def _cache_key(self, chat_messages: List[Any], model: str) -> str:
+        """Hash everything that determines the LLM response."""
+        payload = json.dumps([
+            self.name,
+            model,
+            self.temperature,
+            self.max_tokens,
+            [(message.type, message.content) for message in chat_messages]
+        ])
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def _get_cached_response(self, cache_key: str) -> Optional[str]:
+        """Return a cached response that has not expired yet."""
+        if not self.cache_ttl:
+            return None
+        cached = self._response_cache.get(cache_key)
+        if cached is None or cached[0] < time.monotonic():
+            return None
+        self._response_cache.move_to_end(cache_key)
+        return cached[1]
+    
+    def _cache_response(self, cache_key: str, content: str):
+        """Store a response, evicting the least recently used entries over the cache size."""
+        if not self.cache_ttl:
+            return
+        self._response_cache[cache_key] = (time.monotonic() + self.cache_ttl, content)
+        self._response_cache.move_to_end(cache_key)
+        while len(self._response_cache) > self.response_cache_size:
+            self._response_cache.popitem(last=False)
     
     def get_capabilities(self) -> List[str]:
         """Return list of agent capabilities."""
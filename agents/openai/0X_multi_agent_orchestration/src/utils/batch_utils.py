@@ -0,0 +1,136 @@
+"""
+OpenAI Batch API support for running many agent pipelines at once.
+"""
+
+import asyncio
+import json
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+
+from openai import AsyncOpenAI
+
+# Set while a batch run is active; agents queue their LLM requests here instead of calling the API
+active_batch_runner: ContextVar[Optional["OpenAIBatchRunner"]] = ContextVar("active_batch_runner", default=None)
+
+MESSAGE_ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+FINAL_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def chat_completion_body(
+    model: str,
+    temperature: float,
+    max_tokens: Optional[int],
+    chat_messages: List[Any]
+) -> Dict[str, Any]:
+    """Build the /v1/chat/completions request body for LangChain chat messages."""
+    body = {
+        "model": model,
+        "temperature": temperature,
+        "messages": [
+            {"role": MESSAGE_ROLES[message.type], "content": message.content}
+            for message in chat_messages
+        ]
+    }
+    if max_tokens:
+        body["max_tokens"] = max_tokens
+    return body
+
+
+class OpenAIBatchRunner:
+    """
+    Run agent pipelines concurrently, sending their LLM requests as OpenAI Batch API jobs.
+
+    Every pipeline advances until it waits on the LLM; once no new request arrived for
+    `collect_window` seconds, all queued requests are submitted as one batch job. The
+    pipelines then resume with the results, so each stage is one job across all inputs.
+    """
+
+    def __init__(
+        self,
+        client: Optional[AsyncOpenAI] = None,
+        collect_window: float = 0.1,
+        poll_interval: float = 30.0
+    ):
+        self.client = client or AsyncOpenAI()
+        self.collect_window = collect_window  # seconds
+        self.poll_interval = poll_interval  # seconds between batch status checks
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._new_request = asyncio.Event()
+
+    def request(self, body: Dict[str, Any]) -> Awaitable[str]:
+        """Queue a chat completion request and return a future for the response content."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((body, future))
+        self._new_request.set()
+        return future
+
+    async def run(self, coroutines: List[Awaitable[Any]]) -> List[Any]:
+        """Run the pipelines to completion, submitting their LLM requests in batch jobs."""
+        # Tasks copy the current context, so the pipelines see this runner
+        token = active_batch_runner.set(self)
+        try:
+            tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+        finally:
+            active_batch_runner.reset(token)
+
+        while not all(task.done() for task in tasks):
+            # Let the pipelines advance until they are all quiet
+            while True:
+                self._new_request.clear()
+                try:
+                    await asyncio.wait_for(self._new_request.wait(), self.collect_window)
+                except asyncio.TimeoutError:
+                    break
+
+            if self._pending:
+                requests, self._pending = self._pending, []
+                await self._submit(requests)
+
+        return await asyncio.gather(*tasks)
+
+    async def _submit(self, requests: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        """Submit queued requests as one batch job and resolve their futures with the results."""
+        lines = [
+            json.dumps({"custom_id": str(i), "method": "POST", "url": "/v1/chat/completions", "body": body})
+            for i, (body, _) in enumerate(requests)
+        ]
+
+        try:
+            batch_file = await self.client.files.create(
+                file=("requests.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch"
+            )
+            batch = await self.client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            while batch.status not in FINAL_BATCH_STATUSES:
+                await asyncio.sleep(self.poll_interval)
+                batch = await self.client.batches.retrieve(batch.id)
+
+            contents = {}
+            if batch.output_file_id:
+                output = await self.client.files.content(batch.output_file_id)
+                for line in output.text.splitlines():
+                    result = json.loads(line)
+                    response = result.get("response") or {}
+                    if response.get("status_code") == 200:
+                        contents[result["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+        except Exception as e:
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for i, (_, future) in enumerate(requests):
+            # The pipeline waiting on the request may have been cancelled meanwhile
+            if future.done():
+                continue
+            content = contents.get(str(i))
+            if content is None:
+                future.set_exception(
+                    RuntimeError(f"Batch {batch.id} has no result for request {i} (status: {batch.status})")
+                )
+            else:
+                future.set_result(content)
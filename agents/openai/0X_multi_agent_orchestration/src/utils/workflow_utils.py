@@ -3,58 +3,90 @@ Utility functions for the multi-agent orchestration system.
 """
 
 import asyncio
+import hashlib
+import io
 import json
+import os
+import re
 import time
-from datetime import datetime, timedelta
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import orjson
+import ormsgpack
+
+# Compiled once for extract_urls_from_text
+_URL_RE = re.compile(r'https?://(?:[-\w.])+(?:[:\d]+)?(?:/(?:[\w/_.])*(?:\?(?:[\w&=%.])*)?(?:#(?:[\w.])*)?)?')
+
+# Keys every workflow output must have, in the order missing ones are reported
+_REQUIRED_OUTPUT_KEYS = (
+    "query",
+    "research_summary",
+    "key_insights",
+    "strategic_recommendations",
+    "action_plan",
+    "next_steps"
+)
+
+# Component weights of calculate_confidence_score
+_CONFIDENCE_WEIGHTS = {
+    "research": 0.3,
+    "analysis": 0.4,
+    "action": 0.3
+}
+_RESEARCH_WEIGHT = _CONFIDENCE_WEIGHTS["research"]
+_ANALYSIS_WEIGHT = _CONFIDENCE_WEIGHTS["analysis"]
+_ACTION_WEIGHT = _CONFIDENCE_WEIGHTS["action"]
 
 
 class WorkflowTimer:
     """Timer utility for tracking workflow execution time."""
     
+    __slots__ = ("start_time", "end_time", "_starts", "_durations")
+    
+    # Monotonic integer nanoseconds: immune to wall-clock adjustments and float rounding
+    _clock = staticmethod(time.perf_counter_ns)
+    
     def __init__(self):
-        self.start_time: Optional[float] = None
-        self.end_time: Optional[float] = None
-        self.step_times: Dict[str, float] = {}
+        self.start_time: Optional[int] = None  # clock ns
+        self.end_time: Optional[int] = None  # clock ns
+        self._starts: Dict[str, int] = {}  # step name -> start clock ns
+        self._durations: Dict[str, float] = {}  # step name -> duration in seconds
     
     def start(self):
         """Start the timer."""
-        self.start_time = time.time()
+        self.start_time = self._clock()
     
     def end(self):
         """End the timer."""
-        self.end_time = time.time()
+        self.end_time = self._clock()
     
     def step_start(self, step_name: str):
         """Start timing a specific step."""
-        self.step_times[f"{step_name}_start"] = time.time()
+        self._starts[step_name] = self._clock()
     
     def step_end(self, step_name: str):
         """End timing a specific step."""
-        if f"{step_name}_start" in self.step_times:
-            start_time = self.step_times[f"{step_name}_start"]
-            self.step_times[f"{step_name}_duration"] = time.time() - start_time
+        start_time = self._starts.pop(step_name, None)
+        if start_time is not None:
+            self._durations[step_name] = (self._clock() - start_time) / 1e9
     
     def get_total_duration(self) -> float:
         """Get total execution duration."""
-        if self.start_time and self.end_time:
-            return self.end_time - self.start_time
+        if self.start_time is not None and self.end_time is not None:
+            return (self.end_time - self.start_time) / 1e9
         return 0.0
     
     def get_step_duration(self, step_name: str) -> float:
         """Get duration of a specific step."""
-        return self.step_times.get(f"{step_name}_duration", 0.0)
+        return self._durations.get(step_name, 0.0)
     
     def get_summary(self) -> Dict[str, Any]:
         """Get timing summary."""
         return {
             "total_duration": self.get_total_duration(),
-            "step_durations": {
-                step.replace("_duration", ""): duration
-                for step, duration in self.step_times.items()
-                if step.endswith("_duration")
-            }
+            "step_durations": dict(self._durations)
         }
 
 class WorkflowValidator:
@@ -64,11 +96,12 @@ class WorkflowValidator:
     def validate_query(query: str) -> Dict[str, Any]:
         """Validate user query."""
         issues = []
+        stripped_query = query.strip()
         
-        if not query or not query.strip():
+        if not stripped_query:
             issues.append("Query cannot be empty")
         
-        if len(query.strip()) < 5:
+        if len(stripped_query) < 5:
             issues.append("Query too short (minimum 5 characters)")
         
         if len(query) > 1000:
@@ -78,7 +111,7 @@ class WorkflowValidator:
             "valid": len(issues) == 0,
             "issues": issues,
             "query_length": len(query),
-            "word_count": len(query.split()) if query else 0
+            "word_count": len(stripped_query.split()) if stripped_query else 0
         }
     
     @staticmethod
@@ -115,19 +148,8 @@ class WorkflowValidator:
     @staticmethod
     def validate_workflow_output(output: Dict[str, Any]) -> Dict[str, Any]:
         """Validate workflow output completeness."""
-        issues = []
-        required_keys = [
-            "query",
-            "research_summary",
-            "key_insights",
-            "strategic_recommendations",
-            "action_plan",
-            "next_steps"
-        ]
-        
-        for key in required_keys:
-            if key not in output:
-                issues.append(f"Missing required output key: {key}")
+        missing_keys = [key for key in _REQUIRED_OUTPUT_KEYS if key not in output]
+        issues = [f"Missing required output key: {key}" for key in missing_keys]
         
         # Check content quality
         if "key_insights" in output and len(output["key_insights"]) == 0:
@@ -142,7 +164,7 @@ class WorkflowValidator:
         return {
             "valid": len(issues) == 0,
             "issues": issues,
-            "completeness_score": (len(required_keys) - len([i for i in issues if "Missing required" in i])) / len(required_keys)
+            "completeness_score": (len(_REQUIRED_OUTPUT_KEYS) - len(missing_keys)) / len(_REQUIRED_OUTPUT_KEYS)
         }
 
 class ResultsFormatter:
@@ -151,71 +173,73 @@ class ResultsFormatter:
     @staticmethod
     def format_for_display(results: Dict[str, Any]) -> str:
         """Format results for human-readable display."""
-        output = []
+        # Written section by section into one buffer; item lists are joined in C
+        output = io.StringIO()
+        write = output.write
         
         # Header
-        output.append("=" * 60)
-        output.append("MULTI-AGENT ORCHESTRATION RESULTS")
-        output.append("=" * 60)
+        write("=" * 60 + "\n")
+        write("MULTI-AGENT ORCHESTRATION RESULTS\n")
+        write("=" * 60 + "\n")
         
         # Query
-        output.append(f"\n🎯 ORIGINAL QUERY:")
-        output.append(f"{results.get('query', 'N/A')}")
+        write(f"\n🎯 ORIGINAL QUERY:\n{results.get('query', 'N/A')}\n")
         
         # Research Summary
-        output.append(f"\n🔍 RESEARCH SUMMARY:")
-        output.append(f"{results.get('research_summary', 'No research summary available')}")
+        write(f"\n🔍 RESEARCH SUMMARY:\n{results.get('research_summary', 'No research summary available')}\n")
         
         # Key Insights
         insights = results.get('key_insights', [])
         if insights:
-            output.append(f"\n💡 KEY INSIGHTS ({len(insights)}):")
-            for i, insight in enumerate(insights, 1):
-                insight_text = insight if isinstance(insight, str) else insight.get('insight', str(insight))
-                output.append(f"{i}. {insight_text}")
+            write(f"\n💡 KEY INSIGHTS ({len(insights)}):\n")
+            write("".join(
+                f"{i}. {insight if isinstance(insight, str) else insight.get('insight', str(insight))}\n"
+                for i, insight in enumerate(insights, 1)
+            ))
         
         # Strategic Recommendations
         recommendations = results.get('strategic_recommendations', [])
         if recommendations:
-            output.append(f"\n📋 STRATEGIC RECOMMENDATIONS ({len(recommendations)}):")
-            for i, rec in enumerate(recommendations, 1):
-                output.append(f"{i}. {rec}")
+            write(f"\n📋 STRATEGIC RECOMMENDATIONS ({len(recommendations)}):\n")
+            write("".join(f"{i}. {rec}\n" for i, rec in enumerate(recommendations, 1)))
         
         # Action Plan
         action_plan = results.get('action_plan', [])
         if action_plan:
-            output.append(f"\n🎯 PRIORITY ACTIONS ({len(action_plan)}):")
+            write(f"\n🎯 PRIORITY ACTIONS ({len(action_plan)}):\n")
             for i, action in enumerate(action_plan, 1):
                 title = action.get('title', f'Action {i}')
                 priority = action.get('priority', 'medium')
-                output.append(f"{i}. [{priority.upper()}] {title}")
-                if action.get('description'):
-                    output.append(f"   {action['description'][:100]}...")
+                write(f"{i}. [{priority.upper()}] {title}\n")
+                description = action.get('description')
+                if description:
+                    write(f"   {truncate_text(description, 100)}\n")
         
         # Next Steps
         next_steps = results.get('next_steps', [])
         if next_steps:
-            output.append(f"\n⏭️ IMMEDIATE NEXT STEPS:")
-            for i, step in enumerate(next_steps, 1):
-                step_text = step if isinstance(step, str) else step.get('action', str(step))
-                output.append(f"{i}. {step_text}")
+            write(f"\n⏭️ IMMEDIATE NEXT STEPS:\n")
+            write("".join(
+                f"{i}. {step if isinstance(step, str) else step.get('action', str(step))}\n"
+                for i, step in enumerate(next_steps, 1)
+            ))
         
         # Metadata
         metadata = results.get('workflow_metadata', {})
         if metadata:
-            output.append(f"\n📊 EXECUTION METADATA:")
-            output.append(f"Duration: {metadata.get('duration_seconds', 0):.2f} seconds")
-            output.append(f"Steps: {' → '.join(metadata.get('agents_used', []))}")
-            output.append(f"Retries: {metadata.get('retry_count', 0)}")
+            write(f"\n📊 EXECUTION METADATA:\n")
+            write(f"Duration: {metadata.get('duration_seconds', 0):.2f} seconds\n")
+            write(f"Steps: {' → '.join(metadata.get('agents_used', []))}\n")
+            write(f"Retries: {metadata.get('retry_count', 0)}\n")
         
-        output.append("\n" + "=" * 60)
+        write("\n" + "=" * 60)
         
-        return "\n".join(output)
+        return output.getvalue()
     
     @staticmethod
     def format_for_json(results: Dict[str, Any]) -> str:
         """Format results as JSON."""
-        return json.dumps(results, indent=2, ensure_ascii=False)
+        return orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
     
     @staticmethod
     def format_summary(results: Dict[str, Any]) -> str:
@@ -229,7 +253,7 @@ class ResultsFormatter:
         
         return f"""
 📋 EXECUTION SUMMARY:
-• Query: {results.get('query', 'N/A')[:50]}...
+• Query: {truncate_text(results.get('query', 'N/A'), 50)}
 • Insights Generated: {insights_count}
 • Recommendations: {recommendations_count}
 • Priority Actions: {actions_count}
@@ -240,68 +264,151 @@ class ResultsFormatter:
 class WorkflowCache:
     """Cache system for workflow results."""
     
+    ttl = 24 * 60 * 60  # seconds
+    memory_cache_size = 128
+    
     def __init__(self, cache_dir: str = ".workflow_cache"):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
+        # In-process LRU in front of the cache files: cache key -> (monotonic expiry, results)
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # Running totals of the cache files, kept up to date by set/get/clear
+        self._count = 0
+        self._total_size = 0  # bytes
+        self.refresh_stats()
     
     def _get_cache_key(self, query: str, user_input: Dict[str, Any]) -> str:
         """Generate cache key for query and input."""
-        import hashlib
-        cache_content = f"{query}_{json.dumps(user_input, sort_keys=True)}"
-        return hashlib.md5(cache_content.encode()).hexdigest()
+        # Hash the canonical bytes directly; the NUL byte separates the query from the input
+        cache_hash = hashlib.blake2b(digest_size=8)
+        cache_hash.update(query.encode())
+        cache_hash.update(b"\x00")
+        cache_hash.update(orjson.dumps(user_input, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS))
+        return cache_hash.hexdigest()
+    
+    def _get_cache_file(self, cache_key: str) -> Path:
+        """Return the cache file of a key, sharded by the first two hex characters of the key."""
+        return self.cache_dir / cache_key[:2] / f"{cache_key}.msgpack"
     
     def get(self, query: str, user_input: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Get cached results if available."""
+        """Get cached results if available; results served from memory are shared, do not mutate them."""
         cache_key = self._get_cache_key(query, user_input)
-        cache_file = self.cache_dir / f"{cache_key}.json"
         
+        # Repeated reads in this process skip the file read and decode
+        remembered = self._memory.get(cache_key)
+        if remembered is not None:
+            if time.monotonic() < remembered[0]:
+                self._memory.move_to_end(cache_key)
+                return remembered[1]
+            del self._memory[cache_key]
+        
+        cache_file = self._get_cache_file(cache_key)
         if cache_file.exists():
             try:
-                with open(cache_file, 'r') as f:
-                    cached_data = json.load(f)
+                cached_data = ormsgpack.unpackb(cache_file.read_bytes())
                 
                 # Check if cache is still valid (24 hours)
-                cached_time = datetime.fromisoformat(cached_data.get('timestamp', ''))
-                if datetime.now() - cached_time < timedelta(hours=24):
-                    return cached_data.get('results')
-            except (json.JSONDecodeError, ValueError, KeyError):
+                remaining = cached_data.get('expires_at', 0) - time.time()
+                if remaining > 0:
+                    results = cached_data.get('results')
+                    self._remember(cache_key, results, remaining)
+                    return results
+            except (ormsgpack.MsgpackDecodeError, ValueError, KeyError):
                 # Invalid cache file, remove it
-                cache_file.unlink(missing_ok=True)
+                self._remove_cache_file(cache_file)
         
         return None
     
     def set(self, query: str, user_input: Dict[str, Any], results: Dict[str, Any]):
         """Cache workflow results."""
         cache_key = self._get_cache_key(query, user_input)
-        cache_file = self.cache_dir / f"{cache_key}.json"
+        cache_file = self._get_cache_file(cache_key)
+        self._remember(cache_key, results, self.ttl)
         
         cache_data = {
             "query": query,
             "user_input": user_input,
             "results": results,
-            "timestamp": datetime.now().isoformat()
+            "expires_at": int(time.time()) + self.ttl
         }
         
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+            self._write_cache_file(cache_file, cache_data)
         except Exception as e:
             print(f"Warning: Failed to cache results: {e}")
     
+    def _write_cache_file(self, cache_file: Path, cache_data: Dict[str, Any]):
+        """Write a cache file atomically, through a temporary file renamed over it."""
+        cache_file.parent.mkdir(exist_ok=True)
+        # Cache files are only machine-read, so they are stored as compact binary MessagePack
+        temp_file = cache_file.with_suffix(".msgpack.tmp")
+        packed = ormsgpack.packb(cache_data, option=ormsgpack.OPT_NON_STR_KEYS)
+        temp_file.write_bytes(packed)
+        previous_size = self._file_size(cache_file)
+        os.replace(temp_file, cache_file)
+        
+        if previous_size is None:
+            self._count += 1
+            previous_size = 0
+        self._total_size += len(packed) - previous_size
+    
+    def _remove_cache_file(self, cache_file: Path):
+        """Delete a cache file and take it out of the running totals."""
+        size = self._file_size(cache_file)
+        cache_file.unlink(missing_ok=True)
+        if size is not None:
+            self._count -= 1
+            self._total_size -= size
+    
+    @staticmethod
+    def _file_size(cache_file: Path) -> Optional[int]:
+        """Return the size of a file in bytes, or None if it does not exist."""
+        try:
+            return cache_file.stat().st_size
+        except FileNotFoundError:
+            return None
+    
+    def _remember(self, cache_key: str, results: Dict[str, Any], ttl_seconds: float):
+        """Keep results in memory, evicting the least recently used entries over the size limit."""
+        self._memory[cache_key] = (time.monotonic() + ttl_seconds, results)
+        self._memory.move_to_end(cache_key)
+        while len(self._memory) > self.memory_cache_size:
+            self._memory.popitem(last=False)
+    
     def clear(self):
         """Clear all cached results."""
-        for cache_file in self.cache_dir.glob("*.json"):
-            cache_file.unlink()
+        self._memory.clear()
+        # Also removes the JSON cache files of former versions, flat or in shard directories
+        for pattern in ("*/*.msgpack", "*.json", "*/*.json"):
+            for cache_file in self.cache_dir.glob(pattern):
+                cache_file.unlink()
+        self._count = 0
+        self._total_size = 0
     
-    def get_cache_stats(self) -> Dict[str, Any]:
-        """Get cache statistics."""
-        cache_files = list(self.cache_dir.glob("*.json"))
-        total_size = sum(f.stat().st_size for f in cache_files)
+    def refresh_stats(self):
+        """Recount the cache files on disk, e.g. after other processes wrote to the cache directory."""
+        cached_results = 0
+        total_size = 0
+        # Walk the shards with scandir, whose entries carry the file stats of the directory listing
+        with os.scandir(self.cache_dir) as shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+                with os.scandir(shard.path) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".msgpack") and entry.is_file():
+                            cached_results += 1
+                            total_size += entry.stat().st_size
         
+        self._count = cached_results
+        self._total_size = total_size
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get cache statistics from the running totals; call refresh_stats first to recount the files."""
         return {
-            "cached_results": len(cache_files),
-            "total_size_bytes": total_size,
-            "total_size_mb": total_size / (1024 * 1024),
+            "cached_results": self._count,
+            "total_size_bytes": self._total_size,
+            "total_size_mb": self._total_size / (1024 * 1024),
             "cache_directory": str(self.cache_dir)
         }
 
@@ -311,13 +418,21 @@ async def run_with_timeout(
     timeout_message: str = "Operation timed out"
 ) -> Any:
     """Run an async operation with timeout."""
+    # asyncio.timeout (Python 3.11+) cancels the awaiting task itself, no wrapper task is created
     try:
-        return await asyncio.wait_for(coro, timeout=timeout_seconds)
-    except asyncio.TimeoutError:
+        async with asyncio.timeout(timeout_seconds):
+            return await coro
+    except TimeoutError:
         raise TimeoutError(f"{timeout_message} (timeout: {timeout_seconds}s)")
 
 def safe_json_loads(json_str: str, fallback: Any = None) -> Any:
     """Safely parse JSON string with fallback."""
+    try:
+        return orjson.loads(json_str)
+    except orjson.JSONDecodeError:
+        pass
+    
+    # orjson rejects some input the stdlib accepts (e.g. NaN/Infinity literals)
     try:
         return json.loads(json_str)
     except (json.JSONDecodeError, TypeError):
@@ -331,9 +446,7 @@ def truncate_text(text: str, max_length: int = 1000, suffix: str = "...") -> str
 
 def extract_urls_from_text(text: str) -> List[str]:
     """Extract URLs from text using regex."""
-    import re
-    url_pattern = r'https?://(?:[-\w.])+(?:[:\d]+)?(?:/(?:[\w/_.])*(?:\?(?:[\w&=%.])*)?(?:#(?:[\w.])*)?)?'
-    return re.findall(url_pattern, text)
+    return _URL_RE.findall(text)
 
 def calculate_confidence_score(
     research_quality: float,
@@ -341,16 +454,10 @@ def calculate_confidence_score(
     action_completeness: float
 ) -> Dict[str, Any]:
     """Calculate overall confidence score for workflow results."""
-    weights = {
-        "research": 0.3,
-        "analysis": 0.4,
-        "action": 0.3
-    }
-    
     overall_score = (
-        research_quality * weights["research"] +
-        analysis_depth * weights["analysis"] +
-        action_completeness * weights["action"]
+        research_quality * _RESEARCH_WEIGHT +
+        analysis_depth * _ANALYSIS_WEIGHT +
+        action_completeness * _ACTION_WEIGHT
     )
     
     confidence_level = "low"
@@ -367,5 +474,6 @@ def calculate_confidence_score(
             "analysis_depth": analysis_depth,
             "action_completeness": action_completeness
         },
-        "weights": weights
+        # A copy, so the results stay a plain serializable dict callers may modify
+        "weights": dict(_CONFIDENCE_WEIGHTS)
     }
\ No newline at end of file
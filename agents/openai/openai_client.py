@@ -1,12 +1,31 @@
+import functools
 import os
 from abc import ABC
 
+import httpx
 from dotenv import load_dotenv
 
-from openai import AsyncOpenAI, OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
 
 load_dotenv(override=True)
 
+# Keep connections warm across requests and multiplex them over HTTP/2
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, keepalive_expiry=30)
+HTTP_RETRIES = 2
+
+
+def _http_client() -> httpx.Client:
+    return DefaultHttpxClient(
+        transport=httpx.HTTPTransport(http2=True, limits=HTTP_LIMITS, retries=HTTP_RETRIES)
+    )
+
+
+def _async_http_client() -> httpx.AsyncClient:
+    return DefaultAsyncHttpxClient(
+        transport=httpx.AsyncHTTPTransport(http2=True, limits=HTTP_LIMITS, retries=HTTP_RETRIES)
+    )
+
+
 class OpenAIClient(ABC):
 
     def __init__(self):
@@ -27,7 +46,7 @@ class OpenAIClient(ABC):
             raise ValueError(f"Unsupported agent provider: {self.name}")
        
     def _get_openai_client(self):
-        return OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+        return OpenAI(api_key=os.environ["OPENAI_API_KEY"], http_client=_http_client())
     
     def _get_anthropic_client(self):
         from anthropic import Anthropic
@@ -36,7 +55,8 @@ class OpenAIClient(ABC):
     def _get_github_client(self):
         return OpenAI(
             base_url=os.getenv("GITHUB_API_URL", "https://models.github.ai/inference"),
-            api_key=os.environ["GITHUB_TOKEN"]
+            api_key=os.environ["GITHUB_TOKEN"],
+            http_client=_http_client(),
         )
 
     def _get_azure_client(self):
@@ -46,13 +66,14 @@ class OpenAIClient(ABC):
         )
         return OpenAI(
             base_url=os.environ["AZURE_ENDPOINT"],
-            api_key=token_provider
+            api_key=token_provider,
+            http_client=_http_client(),
         )
     
     def _get_ollama_client(self):
         # from ollama import AsyncClient
         # return AsyncClient(host=os.getenv("OLLAMA_HOST", "http://localhost:11434"))
-        return OpenAI(base_url=os.environ["OLLAMA_HOST"], api_key="nokeyneeded")
+        return OpenAI(base_url=os.environ["OLLAMA_HOST"], api_key="nokeyneeded", http_client=_http_client())
     
     def __del__(self):
         if self.client is not None:
@@ -61,6 +82,12 @@ class OpenAIClient(ABC):
             except Exception:
                 pass
 
+@functools.cache
+def get_openai_client() -> OpenAIClient:
+    """Return the process-wide OpenAIClient, so every caller shares one connection pool."""
+    return OpenAIClient()
+
+
 class AsyncOpenAIClient(ABC):
 
     def __init__(self):
@@ -81,7 +108,7 @@ class AsyncOpenAIClient(ABC):
             raise ValueError(f"Unsupported agent provider: {self.name}")
        
     def _get_openai_client(self):
-        return AsyncOpenAI(api_key=os.environ["OPENAI_KEY"])
+        return AsyncOpenAI(api_key=os.environ["OPENAI_KEY"], http_client=_async_http_client())
     
     def _get_anthropic_client(self):
         from anthropic import Anthropic
@@ -90,7 +117,8 @@ class AsyncOpenAIClient(ABC):
     def _get_github_client(self):
         return AsyncOpenAI(
             base_url=os.getenv("GITHUB_API_URL", "https://models.github.ai/inference"),
-            api_key=os.environ["GITHUB_TOKEN"]
+            api_key=os.environ["GITHUB_TOKEN"],
+            http_client=_async_http_client(),
         )
 
     def _get_azure_client(self):
@@ -101,13 +129,14 @@ class AsyncOpenAIClient(ABC):
         )
         return AsyncOpenAI(
             base_url=os.environ["AZURE_ENDPOINT"],
-            api_key=token_provider
+            api_key=token_provider,
+            http_client=_async_http_client(),
         )
     
     def _get_ollama_client(self):
         # from ollama import AsyncClient
         # return AsyncClient(host=os.getenv("OLLAMA_HOST", "http://localhost:11434"))
-        return AsyncOpenAI(base_url=os.environ["OLLAMA_HOST"], api_key="nokeyneeded")
+        return AsyncOpenAI(base_url=os.environ["OLLAMA_HOST"], api_key="nokeyneeded", http_client=_async_http_client())
     
     def __del__(self):
         if self.client is not None:
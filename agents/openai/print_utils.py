@@ -1,5 +1,4 @@
-import json
-
+import orjson
 import rich
 from openai.types.chat import ChatCompletion
 from rich.console import Group
@@ -39,13 +38,16 @@ def print_response(response: ChatCompletion, title: str = "Agent Response"):
         "total tokens": usage.total_tokens,
     }
 
-    if getattr(message, "refusal", False):
-        print_message(message.refusal, stats, title="Agent Refusal", style="bold red")
-    elif getattr(message, "tool_calls", None):
+    # refusal and tool_calls are fields of every chat completion message; only parsed
+    # completions have a parsed field
+    refusal = message.refusal
+    parsed = getattr(message, "parsed", None)
+    if refusal:
+        print_message(refusal, stats, title="Agent Refusal", style="bold red")
+    elif message.tool_calls:
         print_message_tools(message, stats, title=title)
-    elif getattr(message, "parsed", None):
-        parse = message.parsed.model_dump_json(indent=2)
-        print_message(parse, stats, title=title)
+    elif parsed:
+        print_message(parsed.model_dump_json(indent=2), stats, title=title)
     else:
         print_message(message.content, stats, title=title)
 
@@ -53,10 +55,11 @@ def print_response(response: ChatCompletion, title: str = "Agent Response"):
 def print_message_tools(message, stats: dict, title: str):
     """Display tool call messages in a formatted panel."""
 
-    tool_responses = "\n\n".join(
+    # A list, not a generator: str.join sizes its result from a concrete sequence in one pass
+    tool_responses = "\n\n".join([
         f"**Tool Id:** {tool.id}\n\n**Tool Used:** {tool.function.name}\n\n**Tool Args:**\n```\n{tool.function.arguments}\n```"
         for tool in message.tool_calls
-    )
+    ])
     # full_message = f"{tool_responses}\n\n**Response:**\n\n{message.content}"
     print_message(tool_responses, stats, title="Agent Tool Calls", style="medium_orchid")
 
@@ -72,11 +75,13 @@ def print_message(
         stats = {}
 
     output = Markdown(message)
-    try:
-        # Try to parse as JSON to check if printable as JSON
-        output = JSON.from_data(json.loads(message))
-    except Exception:
-        pass
+    # Only messages that look like a JSON object or array are parsed, to print them as JSON
+    stripped = message.lstrip() if isinstance(message, str) else ""
+    if stripped[:1] in ("{", "["):
+        try:
+            output = JSON.from_data(orjson.loads(stripped))
+        except orjson.JSONDecodeError:
+            pass
 
     response_group = Group(output, JSON.from_data(stats))
     display_panel(title, response_group, style)
@@ -32,7 +32,7 @@ EXPENSES_FILE = SCRIPT_DIR / "expenses.csv"
 
 # Ensure the expenses file exists
 if not EXPENSES_FILE.exists():
-    EXPENSES_FILE.write_text("item,date,amount\n")
+    EXPENSES_FILE.write_text("date,amount,category,description,payment_method\n")
 
 class PaymentMethod(Enum):
     AMEX = "amex"
@@ -64,14 +64,8 @@ async def add_expense(
     logger.info(f"Adding expense: ${amount} for {description} on {date_iso}")
 
     try:
-        file_exists = EXPENSES_FILE.exists()
-
         with open(EXPENSES_FILE, "a", newline="", encoding="utf-8") as file:
             writer = csv.writer(file)
-
-            if not file_exists:
-                writer.writerow(["date", "amount", "category", "description", "payment_method"])
-
             writer.writerow([date_iso, amount, category.value, description, payment_method.value])
 
         return f"Successfully added expense: ${amount} for {description} on {date_iso}"
@@ -87,20 +81,20 @@ async def get_expenses_data():
 
     try:
         with open(EXPENSES_FILE, newline="", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            expenses_data = list(reader)
-
-        csv_content = f"Expense data ({len(expenses_data)} entries):\n\n"
-        for expense in expenses_data:
-            csv_content += (
-                f"Date: {expense['date']}, "
-                f"Amount: ${expense['amount']}, "
-                f"Category: {expense['category']}, "
-                f"Description: {expense['description']}, "
-                f"Payment: {expense['payment_method']}\n"
-            )
-
-        return csv_content
+            reader = csv.reader(file)
+            next(reader, None)  # skip header, columns are date,amount,category,description,payment_method
+            # Malformed rows without exactly these five cells are skipped instead of failing the read
+            rows = (row for row in reader if len(row) == 5)
+            lines = [
+                f"Date: {expense_date}, "
+                f"Amount: ${amount}, "
+                f"Category: {category}, "
+                f"Description: {description}, "
+                f"Payment: {payment_method}\n"
+                for expense_date, amount, category, description, payment_method in rows
+            ]
+
+        return f"Expense data ({len(lines)} entries):\n\n" + "".join(lines)
 
     except FileNotFoundError:
         logger.error("Expenses file not found")
@@ -4,19 +4,22 @@ from rich.spinner import Spinner
 
 def wait_for_response(task, spinner_text="Waiting for the response..."):
     """
-    Wait for an async task to complete while displaying a spinner.
+    Run a synchronous call while displaying a spinner.
+
+    No polling happens here: the SDK call blocks until the response arrives, so it is
+    passed as a zero-argument callable to run inside the spinner.
     
     Args:
-        task: An awaitable object (coroutine, task, or future) to wait for.
+        task: A zero-argument callable performing the request.
         spinner_text (str, optional): Text to display next to the spinner. 
             Defaults to "Waiting for the response...".
     
     Returns:
-        The result of the awaitable_task once it completes.
+        The result of the call.
     """
     spinner = Spinner("dots", text=spinner_text)
     with Live(spinner, refresh_per_second=10):
-        return task
+        return task()
 
 async def await_for_response(awaitable_task, spinner_text="Waiting for the response..."):
     """